@@ -1,50 +1,89 @@
 """
 Dhan MCP Server - A Model Context Protocol server for Dhan trading platform
 
-This package was missing its implementation files, causing setup.py to fail.
-All required files have now been created to resolve the issue.
+Public names are resolved lazily (PEP 562): importing the package does not pull
+in pydantic, httpx or the server stack until one of them is actually accessed.
 """
 
+import importlib
+import sys
+
 __version__ = "0.1.0"
 __author__ = "Dhan MCP Server Team"
 __description__ = "Complete MCP server for Dhan trading platform integration"
 
-from .server import DhanAPIClient, DhanConfig, main
-from .models import (
-    OrderRequest,
-    ModifyOrderRequest,
-    MarginRequest,
-    MarketDataRequest,
-    HistoricalDataRequest,
-    IntradayDataRequest,
-    LedgerRequest,
-    TradeHistoryRequest,
-    InstrumentMasterRequest,
-    TransactionType,
-    ExchangeSegment,
-    ProductType,
-    OrderType,
-    ValidityType,
-    InstrumentType,
-)
-
-__all__ = [
-    "DhanAPIClient",
-    "DhanConfig",
-    "main",
-    "OrderRequest",
-    "ModifyOrderRequest",
-    "MarginRequest",
-    "MarketDataRequest",
-    "HistoricalDataRequest",
-    "IntradayDataRequest",
-    "LedgerRequest",
-    "TradeHistoryRequest",
-    "InstrumentMasterRequest",
-    "TransactionType",
-    "ExchangeSegment",
-    "ProductType",
-    "OrderType",
-    "ValidityType",
-    "InstrumentType",
-]
\ No newline at end of file
+# Public name -> owning submodule; each submodule declares its own __all__
+_LAZY = {
+    "DhanAPIClient": "dhan_mcp_server.server",
+    "DhanConfig": "dhan_mcp_server.server",
+    "BatchCoalescer": "dhan_mcp_server.server",
+    "configure": "dhan_mcp_server.server",
+    "get_client": "dhan_mcp_server.server",
+    "get_shared_client": "dhan_mcp_server.server",
+    "close_shared_client": "dhan_mcp_server.server",
+    "main": "dhan_mcp_server.server",
+    "TransactionType": "dhan_mcp_server.models",
+    "ExchangeSegment": "dhan_mcp_server.models",
+    "ProductType": "dhan_mcp_server.models",
+    "OrderType": "dhan_mcp_server.models",
+    "Validity": "dhan_mcp_server.models",
+    "OrderStatus": "dhan_mcp_server.models",
+    "LegName": "dhan_mcp_server.models",
+    "OptionType": "dhan_mcp_server.models",
+    "AMOTime": "dhan_mcp_server.models",
+    "OrderModifyRequest": "dhan_mcp_server.models",
+    "OrderRequest": "dhan_mcp_server.models",
+    "OrderResponse": "dhan_mcp_server.models",
+    "OrderDetails": "dhan_mcp_server.models",
+    "TradeDetails": "dhan_mcp_server.models",
+    "UserProfile": "dhan_mcp_server.models",
+    "MarginCalculatorRequest": "dhan_mcp_server.models",
+    "MarginCalculatorResponse": "dhan_mcp_server.models",
+    "FundLimitResponse": "dhan_mcp_server.models",
+    "LedgerEntry": "dhan_mcp_server.models",
+    "HistoricalTradeDetails": "dhan_mcp_server.models",
+    "MarketQuoteDepth": "dhan_mcp_server.models",
+    "MarketDepthData": "dhan_mcp_server.models",
+    "OHLCData": "dhan_mcp_server.models",
+    "MarketQuote": "dhan_mcp_server.models",
+    "HistoricalDataResponse": "dhan_mcp_server.models",
+    "DhanError": "dhan_mcp_server.models",
+    "validate_margin_request": "dhan_mcp_server.models",
+    "convert_margin_request_for_api": "dhan_mcp_server.models",
+    "validate_order_request": "dhan_mcp_server.models",
+    "validate_modify_request": "dhan_mcp_server.models",
+    "convert_order_for_api": "dhan_mcp_server.models",
+    "convert_modify_for_api": "dhan_mcp_server.models",
+}
+
+
+_EXPORTS = frozenset(_LAZY)
+
+
+def _compute_all():
+    """Union of the submodules' own ``__all__``, only needed for star-imports"""
+    from . import models, server
+    return (*server.__all__, *models.__all__)
+
+
+def __getattr__(name):
+    """Import the owning submodule on first access and cache the attribute"""
+    if name == "__all__":
+        value = _compute_all()
+        globals()["__all__"] = value
+        return value
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    target = _LAZY[name]
+    # Skip the import machinery when a sibling name already loaded the submodule
+    module = sys.modules.get(target)
+    if module is None:
+        module = importlib.import_module(target)
+    value = getattr(module, name)
+    # Later lookups hit the module dict directly and never reach __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(_EXPORTS.union(globals()))
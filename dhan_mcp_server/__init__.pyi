@@ -0,0 +1,52 @@
+"""Static view of the lazily resolved package namespace for type checkers"""
+
+__version__: str
+__author__: str
+__description__: str
+
+from .server import (
+    DhanAPIClient as DhanAPIClient,
+    DhanConfig as DhanConfig,
+    BatchCoalescer as BatchCoalescer,
+    configure as configure,
+    get_client as get_client,
+    get_shared_client as get_shared_client,
+    close_shared_client as close_shared_client,
+    main as main,
+)
+from .models import (
+    TransactionType as TransactionType,
+    ExchangeSegment as ExchangeSegment,
+    ProductType as ProductType,
+    OrderType as OrderType,
+    Validity as Validity,
+    OrderStatus as OrderStatus,
+    LegName as LegName,
+    OptionType as OptionType,
+    AMOTime as AMOTime,
+    OrderModifyRequest as OrderModifyRequest,
+    OrderRequest as OrderRequest,
+    OrderResponse as OrderResponse,
+    OrderDetails as OrderDetails,
+    TradeDetails as TradeDetails,
+    UserProfile as UserProfile,
+    MarginCalculatorRequest as MarginCalculatorRequest,
+    MarginCalculatorResponse as MarginCalculatorResponse,
+    FundLimitResponse as FundLimitResponse,
+    LedgerEntry as LedgerEntry,
+    HistoricalTradeDetails as HistoricalTradeDetails,
+    MarketQuoteDepth as MarketQuoteDepth,
+    MarketDepthData as MarketDepthData,
+    OHLCData as OHLCData,
+    MarketQuote as MarketQuote,
+    HistoricalDataResponse as HistoricalDataResponse,
+    DhanError as DhanError,
+    validate_margin_request as validate_margin_request,
+    convert_margin_request_for_api as convert_margin_request_for_api,
+    validate_order_request as validate_order_request,
+    validate_modify_request as validate_modify_request,
+    convert_order_for_api as convert_order_for_api,
+    convert_modify_for_api as convert_modify_for_api,
+)
+
+__all__: tuple[str, ...]
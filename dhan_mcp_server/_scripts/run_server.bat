@@ -0,0 +1,26 @@
+@echo off
+REM Dhan MCP Server Run Script
+REM Banners go to stderr: stdout carries the MCP protocol
+
+>&2 echo Dhan MCP Server
+>&2 echo ================================
+
+REM Check if .env file exists
+if not exist .env (
+    if not exist .env.example (
+        >&2 echo Error: Neither .env nor .env.example found
+        exit /b 1
+    )
+    >&2 echo Creating .env file from .env.example...
+    copy .env.example .env >nul
+    >&2 echo Please edit .env file with your Dhan API credentials
+    exit /b 1
+)
+
+>&2 echo Starting Dhan MCP Server...
+>&2 echo Press Ctrl+C to stop
+>&2 echo.
+
+REM Start the server; uv loads .env, and the server exits with an error if
+REM DHAN_ACCESS_TOKEN is missing or still the placeholder
+uv run --env-file=.env python -m dhan_mcp_server.server
@@ -0,0 +1,34 @@
+#!/bin/bash
+# Dhan MCP Server Run Script
+# Banners go to stderr: stdout carries the MCP protocol
+
+set -e
+
+# Colors for output
+RED='\033[0;31m'
+GREEN='\033[0;32m'
+YELLOW='\033[1;33m'
+NC='\033[0m' # No Color
+
+echo -e "${GREEN}Dhan MCP Server${NC}" >&2
+echo "================================" >&2
+
+# Check if .env file exists
+if [ ! -f .env ]; then
+    if [ ! -f .env.example ]; then
+        echo -e "${RED}Error: Neither .env nor .env.example found${NC}" >&2
+        exit 1
+    fi
+    echo -e "${YELLOW}Creating .env file from .env.example...${NC}" >&2
+    cp .env.example .env
+    echo -e "${YELLOW}Please edit .env file with your Dhan API credentials${NC}" >&2
+    exit 1
+fi
+
+echo -e "${GREEN}Starting Dhan MCP Server...${NC}" >&2
+echo "Press Ctrl+C to stop" >&2
+echo "" >&2
+
+# Start the server; uv loads .env, and the server exits with an error if
+# DHAN_ACCESS_TOKEN is missing or still the placeholder
+exec uv run --env-file=.env python -m dhan_mcp_server.server
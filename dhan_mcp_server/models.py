@@ -7,6 +7,41 @@ from pydantic import BaseModel, Field
 from datetime import datetime
 from enum import Enum
 
+__all__ = (
+    "TransactionType",
+    "ExchangeSegment",
+    "ProductType",
+    "OrderType",
+    "Validity",
+    "OrderStatus",
+    "LegName",
+    "OptionType",
+    "AMOTime",
+    "OrderModifyRequest",
+    "OrderRequest",
+    "OrderResponse",
+    "OrderDetails",
+    "TradeDetails",
+    "UserProfile",
+    "MarginCalculatorRequest",
+    "MarginCalculatorResponse",
+    "FundLimitResponse",
+    "LedgerEntry",
+    "HistoricalTradeDetails",
+    "MarketQuoteDepth",
+    "MarketDepthData",
+    "OHLCData",
+    "MarketQuote",
+    "HistoricalDataResponse",
+    "DhanError",
+    "validate_margin_request",
+    "convert_margin_request_for_api",
+    "validate_order_request",
+    "validate_modify_request",
+    "convert_order_for_api",
+    "convert_modify_for_api",
+)
+
 
 # Enums for better type safety
 class TransactionType(str, Enum):
@@ -73,8 +108,22 @@ class AMOTime(str, Enum):
     OPEN_30 = "OPEN_30"
     OPEN_60 = "OPEN_60"
 
+
+class _RequestModel(BaseModel):
+    """Base for outgoing request models"""
+
+    @classmethod
+    def construct_trusted(cls, **data):
+        """Build an instance from already-validated data, skipping validation.
+
+        Only use this for data the server produced itself; unchecked input
+        must go through the normal constructor.
+        """
+        return cls.model_construct(**data)
+
+
 # Modify Request Models
-class OrderModifyRequest(BaseModel):
+class OrderModifyRequest(_RequestModel):
     """Model for modifying an existing order"""
     dhanClientId: str = Field(..., description="User specific identification generated by Dhan")
     orderId: str = Field(..., description="Order specific identification generated by Dhan")
@@ -88,7 +137,7 @@ class OrderModifyRequest(BaseModel):
 # Request Models
 
 
-class OrderRequest(BaseModel):
+class OrderRequest(_RequestModel):
     """Model for placing a new order"""
     dhanClientId: str = Field(..., description="User specific identification generated by Dhan")
     correlationId: Optional[str] = Field(None, description="User/partner generated id for tracking")
@@ -101,8 +150,11 @@ class OrderRequest(BaseModel):
     quantity: int = Field(..., description="Number of shares for the order", gt=0)
     disclosedQuantity: Optional[int] = Field(None, description="Number of shares visible")
     price: Optional[float] = Field(None, description="Price at which order is placed")
-    triggerPrice: Optional[float] = Field(None, description="Trigger price for SL orders")
-    validity: Validity = Field(..., description="Validity of Order")
+    triggerPrice: Optional[float] = Field(None, description="Price at which order is triggered")
+    afterMarketOrder: bool = Field(False, description="Flag for orders placed after market hours")
+    amoTime: Optional[AMOTime] = Field(None, description="Timing for after market order")
+    boProfitValue: Optional[float] = Field(None, description="Bracket Order Target Price change")
+    boStopLossValue: Optional[float] = Field(None, description="Bracket Order Stop Loss Price change")
 
 
 # Response Models
@@ -180,7 +232,7 @@ class UserProfile(BaseModel):
     dataValidity: str = Field(..., description="Validity date and time for Data API Subscription")
 
 
-class MarginCalculatorRequest(BaseModel):
+class MarginCalculatorRequest(_RequestModel):
     """Model for margin calculation request"""
     dhanClientId: str = Field(..., description="User specific identification generated by Dhan")
     exchangeSegment: ExchangeSegment = Field(..., description="Exchange & Segment")
@@ -321,7 +373,7 @@ class DhanError(BaseModel):
 # Validation helpers for new models
 def validate_margin_request(data: dict) -> MarginCalculatorRequest:
     """Validate and create MarginCalculatorRequest from dictionary"""
-    return MarginCalculatorRequest(**data)
+    return MarginCalculatorRequest.model_validate(data)
 
 
 def convert_margin_request_for_api(request: MarginCalculatorRequest) -> dict:
@@ -338,12 +390,12 @@ def convert_margin_request_for_api(request: MarginCalculatorRequest) -> dict:
 # Validation helpers
 def validate_order_request(data: dict) -> OrderRequest:
     """Validate and create OrderRequest from dictionary"""
-    return OrderRequest(**data)
+    return OrderRequest.model_validate(data)
 
 
 def validate_modify_request(data: dict) -> OrderModifyRequest:
     """Validate and create OrderModifyRequest from dictionary"""
-    return OrderModifyRequest(**data)
+    return OrderModifyRequest.model_validate(data)
 
 
 # Utility functions for data conversion
@@ -391,10 +443,4 @@ def convert_modify_for_api(modify: OrderModifyRequest) -> dict:
         if field not in data:
             data[field] = ""
 
-    return dataNone, description="Price at which order is triggered"
-    afterMarketOrder: bool = Field(False, description="Flag for orders placed after market hours")
-    amoTime: Optional[AMOTime] = Field(None, description="Timing for after market order")
-    boProfitValue: Optional[float] = Field(None, description="Bracket Order Target Price change")
-    boStopLossValue: Optional[float] = Field(None, description="Bracket Order Stop Loss Price change")
-
-
+    return data
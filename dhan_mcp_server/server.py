@@ -3,16 +3,31 @@
 Dhan MCP Server
 A Model Context Protocol server for Dhan trading platform integration.
 """
-import os
-from dotenv import load_dotenv
-import os
-import pandas as pd   # NEW
-from dotenv import load_dotenv
 import asyncio
-import json
+import bisect
 import logging
-from typing import Any, Dict, List, Optional, Sequence
+import os
+import sys
+import tempfile
+import time
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from functools import lru_cache, partial
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import fastjsonschema
 import httpx
+import numpy as np
+import orjson
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.feather as feather
+from dotenv import load_dotenv
+from httpx._utils import get_environment_proxies
 from mcp.server import Server
 from mcp.types import (
     Resource,
@@ -24,7 +39,10 @@ from mcp.types import (
 )
 from pydantic import BaseModel, Field
 
-load_dotenv()  # Add this line after imports
+load_dotenv()
+
+__all__ = ("DhanAPIClient", "DhanConfig", "BatchCoalescer", "configure", "get_client",
+           "get_shared_client", "close_shared_client", "main")
 
 
 access_token = os.getenv("DHAN_ACCESS_TOKEN")
@@ -34,10 +52,36 @@ access_token = os.getenv("DHAN_ACCESS_TOKEN")
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("dhan-mcp")
 
+# Compact output: the MCP client is a model, which gains nothing from indentation
+_DUMPS_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _dumps(obj: Any) -> str:
+    """Serialize a response as compact JSON (orjson; much faster than json.dumps on large payloads)"""
+    return orjson.dumps(obj, option=_DUMPS_OPTIONS).decode()
+
+
+def _body(data: Optional[Dict]) -> Optional[bytes]:
+    """Encode a request body with orjson; the session already sends Content-Type: application/json"""
+    return None if data is None else orjson.dumps(data, option=_DUMPS_OPTIONS)
+
+
 # Dhan API Configuration
 DHAN_BASE_URL = "https://api.dhan.co/v2"
 DHAN_AUTH_URL = "https://auth.dhan.co"
 
+# How long market feed quotes are reused, per endpoint; agents tend to ask for
+# the same tickers several times within a few seconds. Depth is a live order
+# book, so it is only reused very briefly.
+QUOTE_CACHE_TTL = {
+    "/marketfeed/ltp": 1.5,
+    "/marketfeed/ohlc": 5.0,
+    "/marketfeed/quote": 1.0,
+}
+QUOTE_CACHE_SIZE = 10_000
+# Extra time the LTP batcher waits for concurrent symbol lookups to join a batch
+LTP_BATCH_WINDOW = 0.005
+
 COMMON_IDS = {           # NEW - shortcut for popular stocks
     "reliance": "2885",  # NSE_EQ SecurityId for Reliance
     "tcs": "11536",
@@ -45,6 +89,52 @@ COMMON_IDS = {           # NEW - shortcut for popular stocks
     "hdfcbank": "1333"
 }
 
+# Ready-made search records for COMMON_IDS, so these never touch the instrument frame
+COMMON_INSTRUMENTS = {
+    symbol: {
+        "SEM_EXM_EXCH_ID": "NSE",
+        "SEM_SEGMENT": "E",
+        "SEM_SMST_SECURITY_ID": security_id,
+        "SEM_TRADING_SYMBOL": symbol.upper(),
+        "SM_SYMBOL_NAME": symbol.upper(),
+    }
+    for symbol, security_id in COMMON_IDS.items()
+}
+# COMMON_IDS as ints, letting get_ltp_by_symbol build its payload without a search
+_COMMON_IDS_INT = {symbol: int(security_id) for symbol, security_id in COMMON_IDS.items()}
+
+# Attempts to re-establish a connection that failed before any request was sent
+CONNECT_RETRIES = 2
+
+# Rate limits (429) are always retried; gateway errors only for idempotent requests
+RETRY_STATUSES = (429, 502, 503, 504)
+MAX_ATTEMPTS = 4
+# Longest Retry-After (seconds) worth waiting for; beyond it the error is surfaced
+MAX_RETRY_AFTER = 30.0
+
+
+def _retrying_transports(**options) -> Dict[str, Any]:
+    """AsyncClient keyword arguments for transports built with ``options`` that keep proxy support.
+
+    httpx stops reading HTTP(S)_PROXY/NO_PROXY once a custom transport is
+    passed, so each environment proxy is mounted with the same options (httpx
+    itself only applies ``retries`` to direct connections).
+    """
+    mounts = {
+        pattern: None if proxy is None else httpx.AsyncHTTPTransport(proxy=proxy, **options)
+        for pattern, proxy in get_environment_proxies().items()
+    }
+    return {"transport": httpx.AsyncHTTPTransport(**options), "mounts": mounts}
+
+
+def _retry_after(response: httpx.Response) -> float:
+    """Seconds requested by a Retry-After header (0 if absent or an HTTP date)"""
+    try:
+        return max(float(response.headers.get("Retry-After", 0)), 0.0)
+    except ValueError:
+        return 0.0
+
+
 class DhanConfig(BaseModel):
     """Configuration for Dhan API"""
     access_token: str = access_token
@@ -57,72 +147,314 @@ class DhanAPIClient:
 
     def __init__(self, config: DhanConfig):
         self.config = config
+        # Keep connections to api.dhan.co alive and multiplex concurrent tool
+        # calls over HTTP/2 instead of paying a TCP+TLS handshake per request.
+        # Failed connects are retried by the transport; nothing was sent yet,
+        # so this is safe even for order placement
         self.session = httpx.AsyncClient(
             base_url=config.base_url,
             timeout=config.timeout,
+            **_retrying_transports(
+                http2=True,
+                limits=httpx.Limits(
+                    max_connections=100,
+                    max_keepalive_connections=20,
+                    keepalive_expiry=30.0,
+                ),
+                retries=CONNECT_RETRIES,
+            ),
             headers={
                 "access-token": config.access_token,
                 "Content-Type": "application/json"
             }
         )
+        self._coalescers: Dict[Tuple[str, str], "BatchCoalescer"] = {}
+        # Caps concurrent upstream requests so bursts of tool calls don't
+        # stampede the API; identical in-flight GETs share a single request
+        self._sem = asyncio.Semaphore(64)
+        self._inflight: Dict[Tuple, asyncio.Task] = {}
+        # (endpoint, segment, security id) -> (expiry on the monotonic clock, quote),
+        # in least-recently-stored order
+        self._quote_cache: "OrderedDict[Tuple[str, str, str], Tuple[float, Dict[str, Any]]]" = OrderedDict()
 
     async def __aenter__(self):
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
+        for coalescer in self._coalescers.values():
+            await coalescer.close()
         await self.session.aclose()
 
     async def get(self, endpoint: str, params: Optional[Dict] = None) -> Dict[str, Any]:
-        """Make GET request to Dhan API"""
-        try:
-            response = await self.session.get(endpoint, params=params)
-            response.raise_for_status()
-            return response.json()
-        except httpx.HTTPStatusError as e:
-            logger.error(f"HTTP error {e.response.status_code}: {e.response.text}")
-            raise Exception(f"API request failed: {e.response.status_code}")
-        except Exception as e:
-            logger.error(f"Request failed: {str(e)}")
-            raise
-
-    async def post(self, endpoint: str, data: Optional[Dict] = None) -> Dict[str, Any]:
-        """Make POST request to Dhan API"""
-        try:
-            response = await self.session.post(endpoint, json=data)
-            response.raise_for_status()
-            return response.json()
-        except httpx.HTTPStatusError as e:
-            logger.error(f"HTTP error {e.response.status_code}: {e.response.text}")
-            raise Exception(f"API request failed: {e.response.status_code}")
-        except Exception as e:
-            logger.error(f"Request failed: {str(e)}")
-            raise
+        """Make GET request to Dhan API, sharing the response with identical concurrent GETs"""
+        key = (endpoint, tuple(sorted((params or {}).items())))
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._inflight[key] = asyncio.ensure_future(self._get(endpoint, params))
+            task.add_done_callback(partial(self._forget_inflight, key))
+        # Shielded so one caller being cancelled doesn't fail the others
+        return await asyncio.shield(task)
+
+    def _forget_inflight(self, key: Tuple, task: asyncio.Task) -> None:
+        self._inflight.pop(key, None)
+        # Retrieved here so a failure nobody is left awaiting (every caller
+        # cancelled) isn't reported as "Task exception was never retrieved"
+        if not task.cancelled():
+            task.exception()
+
+    async def _get(self, endpoint: str, params: Optional[Dict] = None) -> Dict[str, Any]:
+        return await self._request("GET", endpoint, params=params)
+
+    async def post(self, endpoint: str, data: Optional[Dict] = None,
+                   headers: Optional[Dict] = None, idempotent: bool = False) -> Dict[str, Any]:
+        """Make POST request to Dhan API.
+
+        Only pass ``idempotent=True`` for read-only endpoints; gateway errors are
+        then retried too, which must never happen for e.g. order placement.
+        """
+        return await self._request("POST", endpoint, retry_server_errors=idempotent,
+                                   content=_body(data), headers=headers)
 
     async def put(self, endpoint: str, data: Optional[Dict] = None) -> Dict[str, Any]:
         """Make PUT request to Dhan API"""
-        try:
-            response = await self.session.put(endpoint, json=data)
-            response.raise_for_status()
-            return response.json()
-        except httpx.HTTPStatusError as e:
-            logger.error(f"HTTP error {e.response.status_code}: {e.response.text}")
-            raise Exception(f"API request failed: {e.response.status_code}")
-        except Exception as e:
-            logger.error(f"Request failed: {str(e)}")
-            raise
+        return await self._request("PUT", endpoint, content=_body(data))
 
     async def delete(self, endpoint: str, params: Optional[Dict] = None) -> Dict[str, Any]:
         """Make DELETE request to Dhan API"""
-        try:
-            response = await self.session.delete(endpoint, params=params)
-            response.raise_for_status()
-            return response.json()
-        except httpx.HTTPStatusError as e:
-            logger.error(f"HTTP error {e.response.status_code}: {e.response.text}")
-            raise Exception(f"API request failed: {e.response.status_code}")
-        except Exception as e:
-            logger.error(f"Request failed: {str(e)}")
-            raise
+        return await self._request("DELETE", endpoint, params=params)
+
+    async def _request(self, method: str, endpoint: str, retry_server_errors: bool = True,
+                       **kwargs) -> Dict[str, Any]:
+        """Send a request, backing off and retrying on rate limits and transient gateway errors"""
+        for attempt in range(MAX_ATTEMPTS):
+            try:
+                async with self._sem:
+                    response = await self.session.request(method, endpoint, **kwargs)
+                response.raise_for_status()
+                return orjson.loads(response.content)
+            except httpx.HTTPStatusError as e:
+                status = e.response.status_code
+                retryable = status == 429 or (retry_server_errors and status in RETRY_STATUSES)
+                retry_after = _retry_after(e.response)
+                if retryable and retry_after <= MAX_RETRY_AFTER and attempt < MAX_ATTEMPTS - 1:
+                    delay = min(2 ** attempt, 8) + retry_after
+                    logger.warning(f"HTTP {status} from {endpoint}, retrying in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+                    continue
+                logger.error(f"HTTP error {status}: {e.response.text}")
+                raise Exception(f"API request failed: {status}")
+            except Exception as e:
+                logger.error(f"Request failed: {str(e)}")
+                raise
+
+    async def marketfeed(self, endpoint: str, instruments: Dict[str, List[int]],
+                         client_id: str) -> Dict[str, Any]:
+        """POST a market feed request, batched with concurrent calls to the same endpoint"""
+        key = (endpoint, client_id)
+        coalescer = self._coalescers.get(key)
+        if coalescer is None:
+            window = LTP_BATCH_WINDOW if endpoint == "/marketfeed/ltp" else 0.0
+            coalescer = self._coalescers[key] = BatchCoalescer(self, endpoint, client_id, window=window)
+        return await coalescer.submit(instruments)
+
+    async def quotes(self, endpoint: str, instruments: Dict[str, List[int]],
+                     client_id: str) -> Dict[str, Any]:
+        """Fetch market feed quotes, serving ones seen within the endpoint's QUOTE_CACHE_TTL from memory"""
+        ttl = QUOTE_CACHE_TTL.get(endpoint, 0.0)
+        now = time.monotonic()
+        missing: Dict[str, List[int]] = {}
+        for segment, ids in instruments.items():
+            for security_id in ids:
+                entry = self._quote_cache.get((endpoint, segment, str(security_id)))
+                if entry is None or entry[0] <= now:
+                    missing.setdefault(segment, []).append(security_id)
+
+        if missing:
+            data = await self.marketfeed(endpoint, missing, client_id)
+            if data.get("status") != "success" or "data" not in data:
+                return data
+            fetched = data["data"]
+            expires = now + ttl
+            for segment, quotes in fetched.items():
+                for security_id, quote in quotes.items():
+                    key = (endpoint, segment, security_id)
+                    self._quote_cache[key] = (expires, quote)
+                    self._quote_cache.move_to_end(key)
+            while len(self._quote_cache) > QUOTE_CACHE_SIZE:
+                self._quote_cache.popitem(last=False)
+        else:
+            fetched = {}
+
+        result: Dict[str, Dict[str, Any]] = {}
+        for segment, ids in instruments.items():
+            quotes = result.setdefault(segment, {})
+            for security_id in ids:
+                security_id = str(security_id)
+                quote = fetched.get(segment, {}).get(security_id)
+                if quote is None:
+                    entry = self._quote_cache.get((endpoint, segment, security_id))
+                    quote = entry[1] if entry is not None else None
+                if quote is not None:
+                    quotes[security_id] = quote
+        return {"status": "success", "data": result}
+
+
+class BatchCoalescer:
+    """Coalesce concurrent market feed requests into a single upstream POST.
+
+    The quote endpoints accept many instruments per call, so a background worker
+    takes whatever requests are queued (up to ``max_batch``), merges their
+    ``{segment: [security ids]}`` payloads into one body and hands each caller
+    back only the quotes it asked for. With a non-zero ``window`` the worker
+    lingers that many seconds after the first request so that lookups fired a
+    moment apart (e.g. several get_ltp_by_symbol calls) still share a batch.
+    """
+
+    def __init__(self, client: DhanAPIClient, endpoint: str, client_id: str, max_batch: int = 16,
+                 window: float = 0.0):
+        self.client = client
+        self.endpoint = endpoint
+        self.client_id = client_id
+        self.max_batch = max_batch
+        self.window = window
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self._worker: Optional[asyncio.Task] = None
+
+    async def submit(self, instruments: Dict[str, List[int]]) -> Dict[str, Any]:
+        """Queue a request and wait for its share of the batched response"""
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._drain())
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((instruments, future))
+        return await future
+
+    async def close(self) -> None:
+        """Stop the worker and fail every request still queued or being fetched"""
+        if self._worker is not None:
+            # The worker cancels the requests it has already dequeued
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        while not self.queue.empty():
+            _, future = self.queue.get_nowait()
+            if not future.done():
+                future.cancel()
+
+    async def _drain(self) -> None:
+        while True:
+            batch = [await self.queue.get()]
+            try:
+                if self.window and self.queue.qsize() < self.max_batch - 1:
+                    await asyncio.sleep(self.window)
+                while len(batch) < self.max_batch and not self.queue.empty():
+                    batch.append(self.queue.get_nowait())
+                data = await self._bulk_call([instruments for instruments, _ in batch])
+            except asyncio.CancelledError:
+                # Closed while lingering in the window or posting: nobody
+                # else holds these requests any more
+                for _, future in batch:
+                    if not future.done():
+                        future.cancel()
+                raise
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for instruments, future in batch:
+                if not future.done():
+                    future.set_result(self._slice(data, instruments))
+
+    async def _bulk_call(self, payloads: List[Dict[str, List[int]]]) -> Dict[str, Any]:
+        # Union per segment, so a symbol requested by several callers is fetched once
+        merged: Dict[str, set] = {}
+        for payload in payloads:
+            for segment, ids in payload.items():
+                merged.setdefault(segment, set()).update(ids)
+        body = {segment: sorted(ids) for segment, ids in merged.items()}
+        return await self.client.post(self.endpoint, body, headers={"client-id": self.client_id},
+                                      idempotent=True)
+
+    @staticmethod
+    def _slice(data: Dict[str, Any], instruments: Dict[str, List[int]]) -> Dict[str, Any]:
+        """Keep only the quotes for the instruments one caller requested"""
+        if data.get("status") != "success" or "data" not in data:
+            return data
+        sliced = {}
+        for segment, ids in instruments.items():
+            wanted = {str(security_id) for security_id in ids}
+            quotes = data["data"].get(segment, {})
+            sliced[segment] = {sid: quote for sid, quote in quotes.items() if sid in wanted}
+        return {**data, "data": sliced}
+
+
+class PoolConfig(BaseModel):
+    """Connection pool settings for the shared HTTP client"""
+    max_connections: int = Field(default=100, description="Maximum concurrent connections")
+    max_keepalive: int = Field(default=20, description="Idle connections kept open for reuse")
+    http2: bool = Field(default=True, description="Negotiate HTTP/2 where the server supports it")
+    timeout: float = Field(default=30.0, description="Request timeout in seconds")
+    retries: int = Field(default=CONNECT_RETRIES, description="Retries for connections that fail to open")
+
+
+# Process-wide client for requests outside the Dhan API (e.g. instrument master
+# CSVs), so repeated downloads reuse pooled keep-alive connections
+_POOL_CONFIG = PoolConfig()
+_SHARED_CLIENT: Optional[httpx.AsyncClient] = None
+_RETIRED_CLIENTS: List[httpx.AsyncClient] = []
+
+
+def configure(*, max_connections: int = 100, max_keepalive: int = 20, http2: bool = True,
+              timeout: float = 30.0, retries: int = CONNECT_RETRIES) -> None:
+    """Tune the shared HTTP client's connection pool.
+
+    Calling this before the first request costs nothing. If the client already
+    exists it is retired (and closed on shutdown) and rebuilt with the new
+    settings on next use.
+    """
+    global _POOL_CONFIG, _SHARED_CLIENT
+    _POOL_CONFIG = PoolConfig(
+        max_connections=max_connections,
+        max_keepalive=max_keepalive,
+        http2=http2,
+        timeout=timeout,
+        retries=retries,
+    )
+    if _SHARED_CLIENT is not None:
+        _RETIRED_CLIENTS.append(_SHARED_CLIENT)
+        _SHARED_CLIENT = None
+
+
+def get_shared_client() -> httpx.AsyncClient:
+    """Return the shared HTTP client, creating it on first use"""
+    global _SHARED_CLIENT
+    if _SHARED_CLIENT is None or _SHARED_CLIENT.is_closed:
+        _SHARED_CLIENT = httpx.AsyncClient(
+            timeout=_POOL_CONFIG.timeout,
+            **_retrying_transports(
+                http2=_POOL_CONFIG.http2,
+                limits=httpx.Limits(
+                    max_connections=_POOL_CONFIG.max_connections,
+                    max_keepalive_connections=_POOL_CONFIG.max_keepalive,
+                ),
+                retries=_POOL_CONFIG.retries,
+            ),
+        )
+    return _SHARED_CLIENT
+
+
+async def close_shared_client() -> None:
+    """Close the shared HTTP client, and any retired by configure()"""
+    global _SHARED_CLIENT
+    if _SHARED_CLIENT is not None:
+        _RETIRED_CLIENTS.append(_SHARED_CLIENT)
+        _SHARED_CLIENT = None
+    while _RETIRED_CLIENTS:
+        await _RETIRED_CLIENTS.pop().aclose()
 
 
 # Initialize MCP server
@@ -132,96 +464,487 @@ server = Server("dhan-mcp-server")
 config = None
 api_client = None
 
+
+# The value shipped in .env.example; treated as no token at all
+PLACEHOLDER_ACCESS_TOKEN = "your-dhan-access-token-here"
+
+
+def get_client() -> Optional[DhanAPIClient]:
+    """Return the process-wide Dhan API client, creating it from the environment on first use.
+
+    Every tool call and resource read goes through this one instance, so they
+    all share its connection pool. Returns None if no access token is set.
+    """
+    global config, api_client
+    if api_client is None or api_client.session.is_closed:
+        access_token = os.getenv("DHAN_ACCESS_TOKEN")
+        if not access_token or access_token == PLACEHOLDER_ACCESS_TOKEN:
+            return None
+        config = DhanConfig(access_token=access_token)
+        api_client = DhanAPIClient(config)
+    return api_client
+
 # --------------------------
 # Instrument Master Cache
 # --------------------------
+INSTRUMENT_MASTER_URL = "https://images.dhan.co/api-data/api-scrip-master.csv"
+CACHE_DIR = Path(os.getenv("DHAN_CACHE_DIR") or "~/.cache/dhan_mcp").expanduser()
+INSTRUMENT_CACHE_TTL = 24 * 60 * 60  # The scrip master is republished daily
+# Uncompressed Arrow IPC, so it can be memory-mapped and loaded without decoding
+INSTRUMENT_CACHE_FILE = "instruments.arrow"
+
+SEARCH_COLUMNS = ("SM_SYMBOL_NAME", "SEM_CUSTOM_SYMBOL", "SEM_TRADING_SYMBOL")
+# Distinct (query, filters) results remembered between instrument master refreshes
+SEARCH_CACHE_SIZE = 1024
+# The only scrip master columns kept in memory; the rest are never read
+INSTRUMENT_COLUMNS = (
+    "SEM_SMST_SECURITY_ID", "SEM_EXM_EXCH_ID", "SEM_SEGMENT", "SEM_INSTRUMENT_NAME",
+    "SEM_LOT_UNITS", *SEARCH_COLUMNS,
+)
+# API exchange segment -> (SEM_EXM_EXCH_ID, SEM_SEGMENT) values in the scrip master
+SEGMENT_FILTERS = {
+    "NSE_EQ": ("NSE", "E"),
+    "NSE_FNO": ("NSE", "D"),
+    "NSE_CURR": ("NSE", "C"),
+    "BSE_EQ": ("BSE", "E"),
+    "BSE_FNO": ("BSE", "D"),
+    "BSE_CURR": ("BSE", "C"),
+    "MCX_COMM": ("MCX", "M"),
+}
+# Low-cardinality columns stored as pandas categoricals
+CATEGORY_COLUMNS = ("SEM_EXM_EXCH_ID", "SEM_SEGMENT", "SEM_INSTRUMENT_NAME")
+
+@dataclass
+class InstrumentIndex:
+    """The instrument master plus the lookup structures built from it once per load.
+
+    The frame keeps the original spelling of every column; only the indexes are
+    built from lowercased copies of the search columns.
+    """
+    df: pd.DataFrame
+    # Lowercased symbol/name -> row positions, for O(1) exact lookups
+    exact: Dict[str, List[int]]
+    # Sorted keys and their row positions over every lowercased search column,
+    # so prefix queries are answered with a binary search instead of a scan
+    prefix_keys: List[str]
+    prefix_rows: List[int]
+    # The lowercased search columns joined per row, so substring fallback scans
+    # one Arrow column; kept off the frame so it never leaks into the returned records
+    search_blob: pa.Array
+
+    @classmethod
+    def build(cls, df: pd.DataFrame) -> "InstrumentIndex":
+        """Derive every index from lowercased copies of the search columns"""
+        lowered = {}
+        for column in SEARCH_COLUMNS:
+            # Arrow-backed strings: contiguous UTF-8 buffers, lowercased in bulk by
+            # Arrow's utf8_lower kernel rather than per-element Python str calls
+            values = pa.array(df[column].astype("string[pyarrow]").fillna("").array)
+            df[column] = pd.Series(pd.array(values, dtype="string[pyarrow]"), index=df.index)
+            lowered[column] = pd.Series(pd.array(pc.utf8_lower(values), dtype="string[pyarrow]"),
+                                        index=df.index)
+        lowered = pd.DataFrame(lowered)
+        prefix_keys, prefix_rows = build_prefix_index(lowered)
+        return cls(
+            df=df,
+            exact=build_exact_index(lowered),
+            prefix_keys=prefix_keys,
+            prefix_rows=prefix_rows,
+            search_blob=pa.array((
+                lowered["SM_SYMBOL_NAME"] + "|" + lowered["SEM_CUSTOM_SYMBOL"] + "|"
+                + lowered["SEM_TRADING_SYMBOL"]
+            ).array),
+        )
+
+
+_INSTRUMENT_INDEX: Optional[InstrumentIndex] = None
+# Serializes cold loads so concurrent first searches share a single download
+_INSTRUMENT_LOCK = asyncio.Lock()
+
+
+def build_prefix_index(df: pd.DataFrame) -> Tuple[List[str], List[int]]:
+    """Build a sorted key -> row position index over the search columns"""
+    pairs = sorted(
+        (key, row)
+        for column in SEARCH_COLUMNS
+        for row, key in enumerate(df[column].tolist())
+    )
+    return [key for key, _ in pairs], [row for _, row in pairs]
+
+
+def build_exact_index(df: pd.DataFrame) -> Dict[str, List[int]]:
+    """Map every lowercased search-column value to the rows that carry it"""
+    index: Dict[str, List[int]] = defaultdict(list)
+    columns = df[list(SEARCH_COLUMNS)]
+    for row, keys in enumerate(columns.itertuples(index=False, name=None)):
+        for key in set(keys):
+            index[key].append(row)
+    return dict(index)
+
+
+def conditional_headers(path: Path, meta_path: Path) -> Dict[str, str]:
+    """If-None-Match/If-Modified-Since for a cached download, from its sidecar metadata"""
+    headers: Dict[str, str] = {}
+    if path.exists():
+        try:
+            meta = orjson.loads(meta_path.read_bytes())
+        except (OSError, ValueError):
+            meta = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+    return headers
+
+
+def save_validators(meta_path: Path, response: httpx.Response) -> None:
+    """Record a download's ETag/Last-Modified so the next fetch can be conditional"""
+    try:
+        meta_path.write_bytes(orjson.dumps({
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }))
+    except OSError as e:
+        logger.warning(f"Could not write {meta_path}: {e}")
+
+
+def read_cached_instruments(max_age: Optional[float] = INSTRUMENT_CACHE_TTL) -> Optional[pd.DataFrame]:
+    """Return the cached instrument master, or None if missing or older than ``max_age``.
+
+    The file is uncompressed Arrow, read through a memory map, so a warm start
+    skips CSV parsing; the columns are still copied into this process's DataFrame.
+    """
+    path = CACHE_DIR / INSTRUMENT_CACHE_FILE
+    try:
+        if max_age is None or time.time() - path.stat().st_mtime < max_age:
+            table = feather.read_table(path, columns=list(INSTRUMENT_COLUMNS), memory_map=True)
+            return table.to_pandas()
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError, KeyError, pa.ArrowException) as e:
+        # Unreadable, or written before a column was added: rebuild it
+        logger.warning(f"Ignoring instrument cache {path}: {e}")
+    return None
+
+
+def parse_instrument_master(content: bytes) -> pd.DataFrame:
+    """Parse the downloaded CSV (multi-threaded pyarrow reader)"""
+    # Security ids are identifiers, and symbols must never be inferred as numbers
+    string_columns = ("SEM_SMST_SECURITY_ID", *SEARCH_COLUMNS)
+    table = pa_csv.read_csv(
+        pa.BufferReader(content),
+        convert_options=pa_csv.ConvertOptions(
+            include_columns=list(INSTRUMENT_COLUMNS),
+            column_types={column: pa.string() for column in string_columns},
+        ),
+    )
+    # Lot sizes are published as "75.0"; store them as int32 when they are all whole
+    index = table.schema.get_field_index("SEM_LOT_UNITS")
+    try:
+        table = table.set_column(index, "SEM_LOT_UNITS", pc.cast(table.column(index), pa.int32()))
+    except pa.ArrowInvalid:
+        pass
+    df = table.to_pandas()
+    for column in CATEGORY_COLUMNS:
+        df[column] = df[column].astype("category")
+    return df
+
+
+def write_instrument_cache(df: pd.DataFrame) -> bool:
+    """Replace the on-disk instrument cache with ``df``; False if it could not be written"""
+    path = CACHE_DIR / INSTRUMENT_CACHE_FILE
+    tmp = None
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=path.parent, prefix=f"{path.name}.", suffix=".tmp",
+                                         delete=False) as out:
+            tmp = out.name
+        feather.write_feather(df, tmp, compression="uncompressed")
+        # Swapped in whole: other processes may still have the old file mapped
+        os.replace(tmp, path)
+    except OSError as e:
+        if tmp is not None and os.path.exists(tmp):
+            os.unlink(tmp)
+        logger.warning(f"Could not write instrument cache {path}: {e}")
+        return False
+    return True
+
+
+async def download_instrument_master() -> pd.DataFrame:
+    """Fetch and parse the instrument master, revalidating an expired cache first.
+
+    The scrip master is republished daily but often unchanged; a 304 just
+    renews the cached copy for another INSTRUMENT_CACHE_TTL.
+    """
+    path = CACHE_DIR / INSTRUMENT_CACHE_FILE
+    meta_path = CACHE_DIR / "instruments.meta.json"
+    logger.info("Downloading instrument master CSV...")
+    client = get_shared_client()
+    response = await client.get(INSTRUMENT_MASTER_URL, headers=conditional_headers(path, meta_path))
+    if response.status_code == 304:
+        df = await asyncio.to_thread(read_cached_instruments, None)
+        if df is not None:
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            return df
+        response = await client.get(INSTRUMENT_MASTER_URL)
+    response.raise_for_status()
+    df = await asyncio.to_thread(parse_instrument_master, response.content)
+    # Validators describe the file on disk: pairing them with a stale cache
+    # that failed to be replaced would pin it through every later 304
+    if await asyncio.to_thread(write_instrument_cache, df):
+        save_validators(meta_path, response)
+    return df
+
+
+async def load_instrument_index() -> InstrumentIndex:
+    """Load the instrument master and its search indexes (cached)"""
+    global _INSTRUMENT_INDEX
+    if _INSTRUMENT_INDEX is not None:
+        return _INSTRUMENT_INDEX
+    async with _INSTRUMENT_LOCK:
+        if _INSTRUMENT_INDEX is None:
+            df = await asyncio.to_thread(read_cached_instruments)
+            if df is None:
+                df = await download_instrument_master()
+            _INSTRUMENT_INDEX = await asyncio.to_thread(InstrumentIndex.build, df)
+            search_instrument_index.cache_clear()
+            logger.info(f"Instrument cache loaded: {len(df)} rows")
+    return _INSTRUMENT_INDEX
+
+
 async def load_instruments() -> pd.DataFrame:
     """Load instrument master CSV into memory (cached)."""
-    global INSTRUMENT_CACHE
-    if INSTRUMENT_CACHE is None:
-        url = "https://images.dhan.co/api-data/api-scrip-master.csv"
-        logger.info("Downloading instrument master CSV...")
-        df = pd.read_csv(url)
-        df["SM_SYMBOL_NAME"] = df["SM_SYMBOL_NAME"].astype(str).str.lower()
-        df["SEM_CUSTOM_SYMBOL"] = df["SEM_CUSTOM_SYMBOL"].astype(str).str.lower()
-        df["SEM_TRADING_SYMBOL"] = df["SEM_TRADING_SYMBOL"].astype(str).str.lower()
-        INSTRUMENT_CACHE = df
-        logger.info(f"Instrument cache loaded: {len(df)} rows")
-    return INSTRUMENT_CACHE
+    return (await load_instrument_index()).df
+
+
+CSV_SAMPLE_ROWS = 5
+# url -> (mtime of the cached file, header + sample rows, record count), so an
+# unchanged file is scanned once and never held in memory whole
+_CSV_SUMMARIES: Dict[str, Tuple[float, List[str], int]] = {}
+
+
+def summarize_csv_lines(lines) -> Tuple[List[str], int]:
+    """Header plus the first CSV_SAMPLE_ROWS rows, and the number of data rows"""
+    head: List[str] = []
+    count = 0
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if not line.strip():
+            continue
+        if len(head) <= CSV_SAMPLE_ROWS:
+            head.append(line)
+        count += 1
+    return head, max(count - 1, 0)
+
+
+def summarize_csv_file(path: Path) -> Tuple[List[str], int]:
+    """summarize_csv_lines for a file on disk.
+
+    Only the sample rows are decoded; records are counted by scanning the raw
+    bytes for newlines in 1 MiB chunks.
+    """
+    with open(path, encoding="utf-8", newline="") as f:
+        head = [line.rstrip("\r\n") for line in islice(f, CSV_SAMPLE_ROWS + 1)]
+    lines = 0
+    last = b"\n"
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            lines += chunk.count(b"\n")
+            last = chunk[-1:]
+    if last != b"\n":
+        lines += 1  # Final row without a trailing newline
+    return head, max(lines - 1, 0)
+
+
+async def fetch_instrument_csv(url: str) -> Tuple[List[str], int]:
+    """Return a scrip master CSV's header and first rows, plus its record count.
+
+    The body is streamed to CACHE_DIR in chunks and revalidated with
+    ETag/Last-Modified, so an unchanged file costs one conditional GET
+    answered with 304 and no body.
+    """
+    name = url.rsplit("/", 1)[-1]
+    path = CACHE_DIR / name
+    meta_path = CACHE_DIR / f"{name}.meta.json"
+
+    headers = conditional_headers(path, meta_path)
+    async with get_shared_client().stream("GET", url, headers=headers) as response:
+        if response.status_code != 304:
+            response.raise_for_status()
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                # Unique per download so concurrent fetches of the same file
+                # (other tasks or processes) never write into each other's copy
+                out = tempfile.NamedTemporaryFile(dir=path.parent, prefix=f"{name}.", suffix=".tmp",
+                                                  delete=False)
+            except OSError as e:
+                logger.warning(f"Could not cache {url} at {path}: {e}")
+                return summarize_csv_lines((await response.aread()).decode().splitlines())
+            try:
+                with out:
+                    async for chunk in response.aiter_bytes():
+                        out.write(chunk)
+                os.replace(out.name, path)
+            except BaseException:
+                os.unlink(out.name)
+                raise
+            save_validators(meta_path, response)
+
+    mtime = path.stat().st_mtime
+    cached = _CSV_SUMMARIES.get(url)
+    if cached is None or cached[0] != mtime:
+        head, count = await asyncio.to_thread(summarize_csv_file, path)
+        cached = _CSV_SUMMARIES[url] = (mtime, head, count)
+    return cached[1], cached[2]
+
+
+async def prefetch_instruments() -> None:
+    """Warm the instrument cache in the background; failures are retried on first search"""
+    try:
+        await load_instrument_index()
+    except Exception as e:
+        logger.warning(f"Instrument prefetch failed: {e}")
 
 
 async def fast_search_instrument(query: str, limit: int = 5):
-    """Search cached instruments quickly."""
-    df = await load_instruments()
-    q = query.lower()
-    matches = df[
-        df["SM_SYMBOL_NAME"].str.contains(q, na=False) |
-        df["SEM_CUSTOM_SYMBOL"].str.contains(q, na=False) |
-        df["SEM_TRADING_SYMBOL"].str.contains(q, na=False)
-    ]
-    return matches.head(limit).to_dict(orient="records")
-
+    """Search cached instruments quickly.
+
+    COMMON_IDS symbols are answered without loading the instrument master.
+    Otherwise exact symbol/name matches come from a dict lookup, then symbols
+    and names starting with the query are found through the prefix index; only
+    if that yields fewer than ``limit`` rows are the columns scanned for
+    substring matches.
+    """
+    q = query.lower().strip()
+    common = COMMON_INSTRUMENTS.get(q)
+    if common is not None:
+        return [dict(common)]
+
+    await load_instrument_index()
+    # Copies, so callers can't mutate the memoized records
+    return [dict(record) for record in search_instrument_index(q, limit)]
+
+
+@lru_cache(maxsize=SEARCH_CACHE_SIZE)
+def search_instrument_index(q: str, limit: int, exchange_segment: Optional[str] = None,
+                            instrument_type: Optional[str] = None) -> Tuple[Dict[str, Any], ...]:
+    """Memoized search over the loaded index; cleared whenever the index is rebuilt.
+
+    ``exchange_segment`` (e.g. "NSE_EQ") and ``instrument_type`` (e.g. "OPTIDX")
+    restrict the rows before ``limit`` is applied.
+    """
+    index = _INSTRUMENT_INDEX
+    df = index.df
+
+    keep = None
+    if exchange_segment or instrument_type:
+        keep = pd.Series(True, index=df.index)
+        if exchange_segment:
+            exchange, segment = SEGMENT_FILTERS[exchange_segment]
+            keep &= (df["SEM_EXM_EXCH_ID"] == exchange) & (df["SEM_SEGMENT"] == segment)
+        if instrument_type:
+            keep &= df["SEM_INSTRUMENT_NAME"] == instrument_type
+        keep = keep.to_numpy()
+
+    rows = [row for row in index.exact.get(q, []) if keep is None or keep[row]][:limit]
+    if len(rows) >= limit:
+        return tuple(df.iloc[rows].to_dict(orient="records"))
+
+    seen = set(rows)
+    keys, positions = index.prefix_keys, index.prefix_rows
+    i = bisect.bisect_left(keys, q)
+    while i < len(keys) and keys[i].startswith(q) and len(rows) < limit:
+        row = positions[i]
+        if row not in seen and (keep is None or keep[row]):
+            seen.add(row)
+            rows.append(row)
+        i += 1
+
+    if len(rows) < limit:
+        # Arrow's substring kernel, run only over rows that pass the cheap
+        # categorical filters
+        if keep is None:
+            candidates = np.arange(len(index.search_blob))
+            blob = index.search_blob
+        else:
+            candidates = keep.nonzero()[0]
+            blob = index.search_blob.take(pa.array(candidates))
+        candidates = candidates[pc.match_substring(blob, q).to_numpy(zero_copy_only=False)]
+        for row in candidates.tolist():
+            if row not in seen:
+                rows.append(row)
+                if len(rows) >= limit:
+                    break
+
+    return tuple(df.iloc[rows].to_dict(orient="records"))
+
+
+# Static resource listing, built once at import
+_RESOURCES: List[Resource] = [
+    Resource(
+        uri="dhan://profile",
+        name="User Profile",
+        description="Current user profile and account information",
+        mimeType="application/json",
+    ),
+    Resource(
+        uri="dhan://positions",
+        name="Trading Positions",
+        description="Current trading positions",
+        mimeType="application/json",
+    ),
+    Resource(
+        uri="dhan://holdings",
+        name="Holdings",
+        description="Long-term holdings and investments",
+        mimeType="application/json",
+    ),
+    Resource(
+        uri="dhan://orders",
+        name="Order History",
+        description="Trading order history and status",
+        mimeType="application/json",
+    ),
+    Resource(
+        uri="dhan://trades",
+        name="Trade History",
+        description="Executed trades for the day",
+        mimeType="application/json",
+    ),
+    Resource(
+        uri="dhan://funds",
+        name="Account Funds",
+        description="Available funds and margin information",
+        mimeType="application/json",
+    ),
+    Resource(
+        uri="dhan://ledger",
+        name="Account Ledger",
+        description="Credit/debit transaction history (requires date parameters)",
+        mimeType="application/json",
+    ),
+    Resource(
+        uri="dhan://historical-trades",
+        name="Historical Trades",
+        description="Detailed historical trade data (requires date parameters)",
+        mimeType="application/json",
+    ),
+    Resource(
+        uri="dhan://instruments",
+        name="Instrument Master",
+        description="Complete instrument list with security IDs and details",
+        mimeType="application/json",
+    ),
+]
 
 
 @server.list_resources()
 async def list_resources() -> List[Resource]:
     """List available resources"""
-    return [
-        Resource(
-            uri="dhan://profile",
-            name="User Profile",
-            description="Current user profile and account information",
-            mimeType="application/json",
-        ),
-        Resource(
-            uri="dhan://positions",
-            name="Trading Positions",
-            description="Current trading positions",
-            mimeType="application/json",
-        ),
-        Resource(
-            uri="dhan://holdings",
-            name="Holdings",
-            description="Long-term holdings and investments",
-            mimeType="application/json",
-        ),
-        Resource(
-            uri="dhan://orders",
-            name="Order History",
-            description="Trading order history and status",
-            mimeType="application/json",
-        ),
-        Resource(
-            uri="dhan://trades",
-            name="Trade History",
-            description="Executed trades for the day",
-            mimeType="application/json",
-        ),
-        Resource(
-            uri="dhan://funds",
-            name="Account Funds",
-            description="Available funds and margin information",
-            mimeType="application/json",
-        ),
-        Resource(
-            uri="dhan://ledger",
-            name="Account Ledger",
-            description="Credit/debit transaction history (requires date parameters)",
-            mimeType="application/json",
-        ),
-        Resource(
-            uri="dhan://historical-trades",
-            name="Historical Trades",
-            description="Detailed historical trade data (requires date parameters)",
-            mimeType="application/json",
-        ),
-        Resource(
-            uri="dhan://instruments",
-            name="Instrument Master",
-            description="Complete instrument list with security IDs and details",
-            mimeType="application/json",
-        ),
-    ]
+    return _RESOURCES
 
 # --------------------------
 # Tools
@@ -230,1245 +953,1264 @@ async def list_resources() -> List[Resource]:
 @server.read_resource()
 async def read_resource(uri: str) -> str:
     """Read a specific resource"""
+    api_client = get_client()
     if not api_client:
         raise Exception("Dhan API client not initialized")
 
     try:
         if uri == "dhan://profile":
             data = await api_client.get("/profile")
-            return json.dumps(data, indent=2)
+            return _dumps(data)
         elif uri == "dhan://positions":
             # TODO: Implement when positions endpoint is available
-            return json.dumps({"message": "Positions endpoint not yet implemented"}, indent=2)
+            return _dumps({"message": "Positions endpoint not yet implemented"})
         elif uri == "dhan://holdings":
             # TODO: Implement when holdings endpoint is available
-            return json.dumps({"message": "Holdings endpoint not yet implemented"}, indent=2)
+            return _dumps({"message": "Holdings endpoint not yet implemented"})
         elif uri == "dhan://orders":
             data = await api_client.get("/orders")
-            return json.dumps(data, indent=2)
+            return _dumps(data)
         elif uri == "dhan://trades":
             data = await api_client.get("/trades")
-            return json.dumps(data, indent=2)
+            return _dumps(data)
         elif uri == "dhan://funds":
             data = await api_client.get("/fundlimit")
-            return json.dumps(data, indent=2)
+            return _dumps(data)
         else:
             raise Exception(f"Unknown resource: {uri}")
     except Exception as e:
-        return json.dumps({"error": str(e)}, indent=2)
+        return _dumps({"error": str(e)})
 
 
-@server.list_tools()
-async def list_tools() -> List[Tool]:
-    """List available tools"""
-    return [
-        Tool(
-            name="get_profile",
-            description="Get user profile and account information",
-            inputSchema={
-                "type": "object",
-                "properties": {},
-                "required": [],
-            },
-        ),
-        Tool(
-            name="validate_token",
-            description="Validate the current access token",
-            inputSchema={
-                "type": "object",
-                "properties": {},
-                "required": [],
-            },
-        ),
-        Tool(
-            name="place_order",
-            description="Place a new trading order",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "dhanClientId": {
-                        "type": "string",
-                        "description": "User specific identification generated by Dhan"
-                    },
-                    "correlationId": {
-                        "type": "string",
-                        "description": "User/partner generated id for tracking back (optional)"
-                    },
-                    "transactionType": {
-                        "type": "string",
-                        "enum": ["BUY", "SELL"],
-                        "description": "The trading side of transaction"
-                    },
-                    "exchangeSegment": {
-                        "type": "string",
-                        "enum": ["NSE_EQ", "NSE_FNO", "NSE_CURR", "BSE_EQ", "BSE_FNO", "BSE_CURR", "MCX_COMM"],
-                        "description": "Exchange Segment"
-                    },
-                    "productType": {
-                        "type": "string",
-                        "enum": ["CNC", "INTRADAY", "MARGIN", "MTF", "CO", "BO"],
-                        "description": "Product type"
-                    },
-                    "orderType": {
-                        "type": "string",
-                        "enum": ["LIMIT", "MARKET", "STOP_LOSS", "STOP_LOSS_MARKET"],
-                        "description": "Order Type"
-                    },
-                    "validity": {
-                        "type": "string",
-                        "enum": ["DAY", "IOC"],
-                        "description": "Validity of Order"
-                    },
-                    "securityId": {
-                        "type": "string",
-                        "description": "Exchange standard ID for each scrip"
-                    },
-                    "quantity": {
-                        "type": "integer",
-                        "description": "Number of shares for the order"
-                    },
-                    "price": {
-                        "type": "number",
-                        "description": "Price at which order is placed (required for LIMIT orders)"
-                    },
-                    "triggerPrice": {
-                        "type": "number",
-                        "description": "Price at which order is triggered (for SL orders)"
-                    },
-                    "disclosedQuantity": {
-                        "type": "integer",
-                        "description": "Number of shares visible (keep more than 30% of quantity)"
-                    },
-                    "afterMarketOrder": {
-                        "type": "boolean",
-                        "description": "Flag for orders placed after market hours",
-                        "default": False
-                    },
-                    "amoTime": {
-                        "type": "string",
-                        "enum": ["PRE_OPEN", "OPEN", "OPEN_30", "OPEN_60"],
-                        "description": "Timing to pump the after market order"
-                    },
-                    "boProfitValue": {
-                        "type": "number",
-                        "description": "Bracket Order Target Price change"
-                    },
-                    "boStopLossValue": {
-                        "type": "number",
-                        "description": "Bracket Order Stop Loss Price change"
-                    }
+_EMPTY_SCHEMA = {
+    "type": "object",
+    "properties": {},
+    "required": [],
+}
+
+# Tool schemas are static, so the list is built once at import rather than per tools/list call
+_TOOLS: List[Tool] = [
+    Tool(
+        name="get_profile",
+        description="Get user profile and account information",
+        inputSchema=_EMPTY_SCHEMA,
+    ),
+    Tool(
+        name="validate_token",
+        description="Validate the current access token",
+        inputSchema=_EMPTY_SCHEMA,
+    ),
+    Tool(
+        name="place_order",
+        description="Place a new trading order",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "dhanClientId": {
+                    "type": "string",
+                    "description": "User specific identification generated by Dhan"
                 },
-                "required": ["dhanClientId", "transactionType", "exchangeSegment", "productType", "orderType",
-                             "validity", "securityId", "quantity"],
-            },
-        ),
-        Tool(
-            name="get_ltp_by_symbol",
-            description="Fetch Last Traded Price (LTP) directly by symbol or company name. Uses cached instrument master for fast lookup.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "query": {"type": "string", "description": "Company symbol or name, e.g. 'Reliance'"},
-                    "exchangeSegment": {
-                        "type": "string",
-                        "enum": ["NSE_EQ", "BSE_EQ"],
-                        "default": "NSE_EQ"
-                    },
-                    "client_id": {"type": "string", "description": "Dhan client ID"}
-                },
-                "required": ["query", "client_id"]
-            }
-            ),
-        Tool(
-            name="modify_order",
-            description="Modify a pending order",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "dhanClientId": {
-                        "type": "string",
-                        "description": "User specific identification generated by Dhan"
-                    },
-                    "orderId": {
-                        "type": "string",
-                        "description": "Order specific identification generated by Dhan"
-                    },
-                    "orderType": {
-                        "type": "string",
-                        "enum": ["LIMIT", "MARKET", "STOP_LOSS", "STOP_LOSS_MARKET"],
-                        "description": "Order Type"
-                    },
-                    "legName": {
-                        "type": "string",
-                        "enum": ["ENTRY_LEG", "TARGET_LEG", "STOP_LOSS_LEG"],
-                        "description": "In case of BO & CO, which leg is modified"
-                    },
-                    "quantity": {
-                        "type": "integer",
-                        "description": "Quantity to be modified"
-                    },
-                    "price": {
-                        "type": "number",
-                        "description": "Price to be modified"
-                    },
-                    "disclosedQuantity": {
-                        "type": "integer",
-                        "description": "Number of shares visible"
-                    },
-                    "triggerPrice": {
-                        "type": "number",
-                        "description": "Trigger price for SL orders"
-                    },
-                    "validity": {
-                        "type": "string",
-                        "enum": ["DAY", "IOC"],
-                        "description": "Validity of Order"
-                    }
+                "correlationId": {
+                    "type": "string",
+                    "description": "User/partner generated id for tracking back (optional)"
+                },
+                "transactionType": {
+                    "type": "string",
+                    "enum": ["BUY", "SELL"],
+                    "description": "The trading side of transaction"
+                },
+                "exchangeSegment": {
+                    "type": "string",
+                    "enum": ["NSE_EQ", "NSE_FNO", "NSE_CURR", "BSE_EQ", "BSE_FNO", "BSE_CURR", "MCX_COMM"],
+                    "description": "Exchange Segment"
+                },
+                "productType": {
+                    "type": "string",
+                    "enum": ["CNC", "INTRADAY", "MARGIN", "MTF", "CO", "BO"],
+                    "description": "Product type"
+                },
+                "orderType": {
+                    "type": "string",
+                    "enum": ["LIMIT", "MARKET", "STOP_LOSS", "STOP_LOSS_MARKET"],
+                    "description": "Order Type"
+                },
+                "validity": {
+                    "type": "string",
+                    "enum": ["DAY", "IOC"],
+                    "description": "Validity of Order"
+                },
+                "securityId": {
+                    "type": "string",
+                    "description": "Exchange standard ID for each scrip"
                 },
-                "required": ["dhanClientId", "orderId", "orderType", "validity"],
+                "quantity": {
+                    "type": "integer",
+                    "description": "Number of shares for the order"
+                },
+                "price": {
+                    "type": "number",
+                    "description": "Price at which order is placed (required for LIMIT orders)"
+                },
+                "triggerPrice": {
+                    "type": "number",
+                    "description": "Price at which order is triggered (for SL orders)"
+                },
+                "disclosedQuantity": {
+                    "type": "integer",
+                    "description": "Number of shares visible (keep more than 30% of quantity)"
+                },
+                "afterMarketOrder": {
+                    "type": "boolean",
+                    "description": "Flag for orders placed after market hours",
+                    "default": False
+                },
+                "amoTime": {
+                    "type": "string",
+                    "enum": ["PRE_OPEN", "OPEN", "OPEN_30", "OPEN_60"],
+                    "description": "Timing to pump the after market order"
+                },
+                "boProfitValue": {
+                    "type": "number",
+                    "description": "Bracket Order Target Price change"
+                },
+                "boStopLossValue": {
+                    "type": "number",
+                    "description": "Bracket Order Stop Loss Price change"
+                }
             },
-        ),
-        Tool(
-            name="cancel_order",
-            description="Cancel a pending order",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "orderId": {
-                        "type": "string",
-                        "description": "Order specific identification generated by Dhan"
-                    }
+            "required": ["dhanClientId", "transactionType", "exchangeSegment", "productType", "orderType",
+                         "validity", "securityId", "quantity"],
+        },
+    ),
+    Tool(
+        name="get_ltp_by_symbol",
+        description="Fetch Last Traded Price (LTP) directly by symbol or company name. Uses cached instrument master for fast lookup.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "query": {"type": "string", "description": "Company symbol or name, e.g. 'Reliance'"},
+                "exchangeSegment": {
+                    "type": "string",
+                    "enum": ["NSE_EQ", "BSE_EQ"],
+                    "default": "NSE_EQ"
                 },
-                "required": ["orderId"],
+                "client_id": {"type": "string", "description": "Dhan client ID"}
             },
+            "required": ["query", "client_id"]
+        }
         ),
-        Tool(
-            name="slice_order",
-            description="Slice order into multiple legs over freeze limit",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "dhanClientId": {
-                        "type": "string",
-                        "description": "User specific identification generated by Dhan"
-                    },
-                    "correlationId": {
-                        "type": "string",
-                        "description": "User/partner generated id for tracking back (optional)"
-                    },
-                    "transactionType": {
-                        "type": "string",
-                        "enum": ["BUY", "SELL"],
-                        "description": "The trading side of transaction"
-                    },
-                    "exchangeSegment": {
-                        "type": "string",
-                        "enum": ["NSE_EQ", "NSE_FNO", "NSE_CURR", "BSE_EQ", "BSE_FNO", "BSE_CURR", "MCX_COMM"],
-                        "description": "Exchange Segment"
-                    },
-                    "productType": {
-                        "type": "string",
-                        "enum": ["CNC", "INTRADAY", "MARGIN", "MTF", "CO", "BO"],
-                        "description": "Product type"
-                    },
-                    "orderType": {
-                        "type": "string",
-                        "enum": ["LIMIT", "MARKET", "STOP_LOSS", "STOP_LOSS_MARKET"],
-                        "description": "Order Type"
-                    },
-                    "validity": {
-                        "type": "string",
-                        "enum": ["DAY", "IOC"],
-                        "description": "Validity of Order"
-                    },
-                    "securityId": {
-                        "type": "string",
-                        "description": "Exchange standard ID for each scrip"
-                    },
-                    "quantity": {
-                        "type": "integer",
-                        "description": "Number of shares for the order (will be sliced)"
-                    },
-                    "price": {
-                        "type": "number",
-                        "description": "Price at which order is placed"
-                    },
-                    "triggerPrice": {
-                        "type": "number",
-                        "description": "Price at which order is triggered"
-                    },
-                    "disclosedQuantity": {
-                        "type": "integer",
-                        "description": "Number of shares visible"
-                    },
-                    "afterMarketOrder": {
-                        "type": "boolean",
-                        "description": "Flag for orders placed after market hours",
-                        "default": False
-                    },
-                    "amoTime": {
-                        "type": "string",
-                        "enum": ["PRE_OPEN", "OPEN", "OPEN_30", "OPEN_60"],
-                        "description": "Timing to pump the after market order"
-                    },
-                    "boProfitValue": {
-                        "type": "number",
-                        "description": "Bracket Order Target Price change"
-                    },
-                    "boStopLossValue": {
-                        "type": "number",
-                        "description": "Bracket Order Stop Loss Price change"
-                    }
+    Tool(
+        name="modify_order",
+        description="Modify a pending order",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "dhanClientId": {
+                    "type": "string",
+                    "description": "User specific identification generated by Dhan"
+                },
+                "orderId": {
+                    "type": "string",
+                    "description": "Order specific identification generated by Dhan"
+                },
+                "orderType": {
+                    "type": "string",
+                    "enum": ["LIMIT", "MARKET", "STOP_LOSS", "STOP_LOSS_MARKET"],
+                    "description": "Order Type"
+                },
+                "legName": {
+                    "type": "string",
+                    "enum": ["ENTRY_LEG", "TARGET_LEG", "STOP_LOSS_LEG"],
+                    "description": "In case of BO & CO, which leg is modified"
+                },
+                "quantity": {
+                    "type": "integer",
+                    "description": "Quantity to be modified"
+                },
+                "price": {
+                    "type": "number",
+                    "description": "Price to be modified"
+                },
+                "disclosedQuantity": {
+                    "type": "integer",
+                    "description": "Number of shares visible"
                 },
-                "required": ["dhanClientId", "transactionType", "exchangeSegment", "productType", "orderType",
-                             "validity", "securityId", "quantity"],
+                "triggerPrice": {
+                    "type": "number",
+                    "description": "Trigger price for SL orders"
+                },
+                "validity": {
+                    "type": "string",
+                    "enum": ["DAY", "IOC"],
+                    "description": "Validity of Order"
+                }
             },
-        ),
-        Tool(
-            name="get_orders",
-            description="Retrieve the list of all orders for the day",
-            inputSchema={
-                "type": "object",
-                "properties": {},
-                "required": [],
+            "required": ["dhanClientId", "orderId", "orderType", "validity"],
+        },
+    ),
+    Tool(
+        name="cancel_order",
+        description="Cancel a pending order",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "orderId": {
+                    "type": "string",
+                    "description": "Order specific identification generated by Dhan"
+                }
             },
-        ),
-        Tool(
-            name="get_order_by_id",
-            description="Retrieve the status of a specific order by order ID",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "orderId": {
-                        "type": "string",
-                        "description": "Order specific identification generated by Dhan"
-                    }
+            "required": ["orderId"],
+        },
+    ),
+    Tool(
+        name="slice_order",
+        description="Slice order into multiple legs over freeze limit",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "dhanClientId": {
+                    "type": "string",
+                    "description": "User specific identification generated by Dhan"
                 },
-                "required": ["orderId"],
-            },
-        ),
-        Tool(
-            name="get_order_by_correlation_id",
-            description="Retrieve the status of an order by correlation ID",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "correlationId": {
-                        "type": "string",
-                        "description": "User/partner generated id for tracking back"
-                    }
+                "correlationId": {
+                    "type": "string",
+                    "description": "User/partner generated id for tracking back (optional)"
                 },
-                "required": ["correlationId"],
+                "transactionType": {
+                    "type": "string",
+                    "enum": ["BUY", "SELL"],
+                    "description": "The trading side of transaction"
+                },
+                "exchangeSegment": {
+                    "type": "string",
+                    "enum": ["NSE_EQ", "NSE_FNO", "NSE_CURR", "BSE_EQ", "BSE_FNO", "BSE_CURR", "MCX_COMM"],
+                    "description": "Exchange Segment"
+                },
+                "productType": {
+                    "type": "string",
+                    "enum": ["CNC", "INTRADAY", "MARGIN", "MTF", "CO", "BO"],
+                    "description": "Product type"
+                },
+                "orderType": {
+                    "type": "string",
+                    "enum": ["LIMIT", "MARKET", "STOP_LOSS", "STOP_LOSS_MARKET"],
+                    "description": "Order Type"
+                },
+                "validity": {
+                    "type": "string",
+                    "enum": ["DAY", "IOC"],
+                    "description": "Validity of Order"
+                },
+                "securityId": {
+                    "type": "string",
+                    "description": "Exchange standard ID for each scrip"
+                },
+                "quantity": {
+                    "type": "integer",
+                    "description": "Number of shares for the order (will be sliced)"
+                },
+                "price": {
+                    "type": "number",
+                    "description": "Price at which order is placed"
+                },
+                "triggerPrice": {
+                    "type": "number",
+                    "description": "Price at which order is triggered"
+                },
+                "disclosedQuantity": {
+                    "type": "integer",
+                    "description": "Number of shares visible"
+                },
+                "afterMarketOrder": {
+                    "type": "boolean",
+                    "description": "Flag for orders placed after market hours",
+                    "default": False
+                },
+                "amoTime": {
+                    "type": "string",
+                    "enum": ["PRE_OPEN", "OPEN", "OPEN_30", "OPEN_60"],
+                    "description": "Timing to pump the after market order"
+                },
+                "boProfitValue": {
+                    "type": "number",
+                    "description": "Bracket Order Target Price change"
+                },
+                "boStopLossValue": {
+                    "type": "number",
+                    "description": "Bracket Order Stop Loss Price change"
+                }
             },
-        ),
-        Tool(
-            name="get_trades",
-            description="Retrieve the list of all trades for the day",
-            inputSchema={
-                "type": "object",
-                "properties": {},
-                "required": [],
+            "required": ["dhanClientId", "transactionType", "exchangeSegment", "productType", "orderType",
+                         "validity", "securityId", "quantity"],
+        },
+    ),
+    Tool(
+        name="get_orders",
+        description="Retrieve the list of all orders for the day",
+        inputSchema=_EMPTY_SCHEMA,
+    ),
+    Tool(
+        name="get_order_by_id",
+        description="Retrieve the status of a specific order by order ID",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "orderId": {
+                    "type": "string",
+                    "description": "Order specific identification generated by Dhan"
+                }
             },
-        ),
-        Tool(
-            name="get_trades_by_order_id",
-            description="Retrieve trade details for a specific order ID",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "orderId": {
-                        "type": "string",
-                        "description": "Order specific identification generated by Dhan"
-                    }
-                },
-                "required": ["orderId"],
+            "required": ["orderId"],
+        },
+    ),
+    Tool(
+        name="get_order_by_correlation_id",
+        description="Retrieve the status of an order by correlation ID",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "correlationId": {
+                    "type": "string",
+                    "description": "User/partner generated id for tracking back"
+                }
             },
-        ),
-        Tool(
-            name="calculate_margin",
-            description="Calculate margin requirement for any order before placing it",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "dhanClientId": {
-                        "type": "string",
-                        "description": "User specific identification generated by Dhan"
-                    },
-                    "exchangeSegment": {
-                        "type": "string",
-                        "enum": ["NSE_EQ", "NSE_FNO", "BSE_EQ", "BSE_FNO", "MCX_COMM"],
-                        "description": "Exchange & Segment"
-                    },
-                    "transactionType": {
-                        "type": "string",
-                        "enum": ["BUY", "SELL"],
-                        "description": "The trading side of transaction"
-                    },
-                    "quantity": {
-                        "type": "integer",
-                        "description": "Number of shares for the order"
-                    },
-                    "productType": {
-                        "type": "string",
-                        "enum": ["CNC", "INTRADAY", "MARGIN", "MTF", "CO", "BO"],
-                        "description": "Product type"
-                    },
-                    "securityId": {
-                        "type": "string",
-                        "description": "Exchange standard ID for each scrip"
-                    },
-                    "price": {
-                        "type": "number",
-                        "description": "Price at which order is placed"
-                    },
-                    "triggerPrice": {
-                        "type": "number",
-                        "description": "Price at which order is triggered (for SL orders)"
-                    }
-                },
-                "required": ["dhanClientId", "exchangeSegment", "transactionType", "quantity", "productType",
-                             "securityId", "price"],
+            "required": ["correlationId"],
+        },
+    ),
+    Tool(
+        name="get_trades",
+        description="Retrieve the list of all trades for the day",
+        inputSchema=_EMPTY_SCHEMA,
+    ),
+    Tool(
+        name="get_trades_by_order_id",
+        description="Retrieve trade details for a specific order ID",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "orderId": {
+                    "type": "string",
+                    "description": "Order specific identification generated by Dhan"
+                }
             },
-        ),
-        Tool(
-            name="get_fund_limits",
-            description="Get trading account fund information including available balance, margins, etc.",
-            inputSchema={
-                "type": "object",
-                "properties": {},
-                "required": [],
+            "required": ["orderId"],
+        },
+    ),
+    Tool(
+        name="calculate_margin",
+        description="Calculate margin requirement for any order before placing it",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "dhanClientId": {
+                    "type": "string",
+                    "description": "User specific identification generated by Dhan"
+                },
+                "exchangeSegment": {
+                    "type": "string",
+                    "enum": ["NSE_EQ", "NSE_FNO", "BSE_EQ", "BSE_FNO", "MCX_COMM"],
+                    "description": "Exchange & Segment"
+                },
+                "transactionType": {
+                    "type": "string",
+                    "enum": ["BUY", "SELL"],
+                    "description": "The trading side of transaction"
+                },
+                "quantity": {
+                    "type": "integer",
+                    "description": "Number of shares for the order"
+                },
+                "productType": {
+                    "type": "string",
+                    "enum": ["CNC", "INTRADAY", "MARGIN", "MTF", "CO", "BO"],
+                    "description": "Product type"
+                },
+                "securityId": {
+                    "type": "string",
+                    "description": "Exchange standard ID for each scrip"
+                },
+                "price": {
+                    "type": "number",
+                    "description": "Price at which order is placed"
+                },
+                "triggerPrice": {
+                    "type": "number",
+                    "description": "Price at which order is triggered (for SL orders)"
+                }
             },
-        ),
-        Tool(
-            name="get_ledger",
-            description="Retrieve Trading Account ledger report with credit/debit details",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "from_date": {
-                        "type": "string",
-                        "description": "Start date in YYYY-MM-DD format",
-                        "pattern": "^\\d{4}-\\d{2}-\\d{2}$"
-                    },
-                    "to_date": {
-                        "type": "string",
-                        "description": "End date in YYYY-MM-DD format",
-                        "pattern": "^\\d{4}-\\d{2}-\\d{2}$"
-                    }
+            "required": ["dhanClientId", "exchangeSegment", "transactionType", "quantity", "productType",
+                         "securityId", "price"],
+        },
+    ),
+    Tool(
+        name="get_fund_limits",
+        description="Get trading account fund information including available balance, margins, etc.",
+        inputSchema=_EMPTY_SCHEMA,
+    ),
+    Tool(
+        name="get_ledger",
+        description="Retrieve Trading Account ledger report with credit/debit details",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "from_date": {
+                    "type": "string",
+                    "description": "Start date in YYYY-MM-DD format",
+                    "pattern": "^\\d{4}-\\d{2}-\\d{2}$"
                 },
-                "required": ["from_date", "to_date"],
+                "to_date": {
+                    "type": "string",
+                    "description": "End date in YYYY-MM-DD format",
+                    "pattern": "^\\d{4}-\\d{2}-\\d{2}$"
+                }
             },
-        ),
-        Tool(
-            name="get_historical_trades",
-            description="Retrieve detailed historical trade data for a date range",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "from_date": {
-                        "type": "string",
-                        "description": "Start date in YYYY-MM-DD format",
-                        "pattern": "^\\d{4}-\\d{2}-\\d{2}$"
-                    },
-                    "to_date": {
-                        "type": "string",
-                        "description": "End date in YYYY-MM-DD format",
-                        "pattern": "^\\d{4}-\\d{2}-\\d{2}$"
-                    },
-                    "page": {
-                        "type": "integer",
-                        "description": "Page number (0 for first page)",
-                        "default": 0,
-                        "minimum": 0
-                    }
+            "required": ["from_date", "to_date"],
+        },
+    ),
+    Tool(
+        name="get_historical_trades",
+        description="Retrieve detailed historical trade data for a date range",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "from_date": {
+                    "type": "string",
+                    "description": "Start date in YYYY-MM-DD format",
+                    "pattern": "^\\d{4}-\\d{2}-\\d{2}$"
                 },
-                "required": ["from_date", "to_date"],
+                "to_date": {
+                    "type": "string",
+                    "description": "End date in YYYY-MM-DD format",
+                    "pattern": "^\\d{4}-\\d{2}-\\d{2}$"
+                },
+                "page": {
+                    "type": "integer",
+                    "description": "Page number (0 for first page)",
+                    "default": 0,
+                    "minimum": 0
+                }
             },
-        ),
-        Tool(
-            name="get_market_ltp",
-            description="Get Last Traded Price (LTP) for multiple instruments",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "instruments": {
-                        "type": "object",
-                        "description": "Instruments grouped by exchange segment",
-                        "additionalProperties": {
-                            "type": "array",
-                            "items": {
-                                "type": "string"
-                            }
+            "required": ["from_date", "to_date"],
+        },
+    ),
+    Tool(
+        name="get_market_ltp",
+        description="Get Last Traded Price (LTP) for multiple instruments",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "instruments": {
+                    "type": "object",
+                    "description": "Instruments grouped by exchange segment",
+                    "additionalProperties": {
+                        "type": "array",
+                        "items": {
+                            "type": "string"
                         }
-                    },
-                    "client_id": {
-                        "type": "string",
-                        "description": "User specific identification generated by Dhan"
                     }
                 },
-                "required": ["instruments", "client_id"],
+                "client_id": {
+                    "type": "string",
+                    "description": "User specific identification generated by Dhan"
+                }
             },
-        ),
-        Tool(
-            name="get_market_ohlc",
-            description="Get OHLC (Open, High, Low, Close) data for multiple instruments",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "instruments": {
-                        "type": "object",
-                        "description": "Instruments grouped by exchange segment",
-                        "additionalProperties": {
-                            "type": "array",
-                            "items": {
-                                "type": "string"
-                            }
+            "required": ["instruments", "client_id"],
+        },
+    ),
+    Tool(
+        name="get_market_ohlc",
+        description="Get OHLC (Open, High, Low, Close) data for multiple instruments",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "instruments": {
+                    "type": "object",
+                    "description": "Instruments grouped by exchange segment",
+                    "additionalProperties": {
+                        "type": "array",
+                        "items": {
+                            "type": "string"
                         }
-                    },
-                    "client_id": {
-                        "type": "string",
-                        "description": "User specific identification generated by Dhan"
                     }
                 },
-                "required": ["instruments", "client_id"],
+                "client_id": {
+                    "type": "string",
+                    "description": "User specific identification generated by Dhan"
+                }
             },
-        ),
-        Tool(
-            name="get_market_depth",
-            description="Get market depth with full quote data including order book",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "instruments": {
-                        "type": "object",
-                        "description": "Instruments grouped by exchange segment",
-                        "additionalProperties": {
-                            "type": "array",
-                            "items": {
-                                "type": "string"
-                            }
+            "required": ["instruments", "client_id"],
+        },
+    ),
+    Tool(
+        name="get_market_depth",
+        description="Get market depth with full quote data including order book",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "instruments": {
+                    "type": "object",
+                    "description": "Instruments grouped by exchange segment",
+                    "additionalProperties": {
+                        "type": "array",
+                        "items": {
+                            "type": "string"
                         }
-                    },
-                    "client_id": {
-                        "type": "string",
-                        "description": "User specific identification generated by Dhan"
                     }
                 },
-                "required": ["instruments", "client_id"],
+                "client_id": {
+                    "type": "string",
+                    "description": "User specific identification generated by Dhan"
+                }
             },
-        ),
-        Tool(
-            name="get_historical_data",
-            description="Get daily historical OHLC data for an instrument",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "securityId": {
-                        "type": "string",
-                        "description": "Exchange standard ID for the instrument"
-                    },
-                    "exchangeSegment": {
-                        "type": "string",
-                        "enum": ["NSE_EQ", "NSE_FNO", "BSE_EQ", "BSE_FNO", "MCX_COMM"],
-                        "description": "Exchange & segment"
-                    },
-                    "instrument": {
-                        "type": "string",
-                        "enum": ["EQUITY", "DERIVATIVES"],
-                        "description": "Instrument type"
-                    },
-                    "fromDate": {
-                        "type": "string",
-                        "description": "Start date in YYYY-MM-DD format",
-                        "pattern": "^\\d{4}-\\d{2}-\\d{2}$"
-                    },
-                    "toDate": {
-                        "type": "string",
-                        "description": "End date in YYYY-MM-DD format",
-                        "pattern": "^\\d{4}-\\d{2}-\\d{2}$"
-                    },
-                    "expiryCode": {
-                        "type": "integer",
-                        "description": "Expiry code for derivatives (optional)",
-                        "default": 0
-                    },
-                    "oi": {
-                        "type": "boolean",
-                        "description": "Include Open Interest data",
-                        "default": False
-                    }
+            "required": ["instruments", "client_id"],
+        },
+    ),
+    Tool(
+        name="get_historical_data",
+        description="Get daily historical OHLC data for an instrument",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "securityId": {
+                    "type": "string",
+                    "description": "Exchange standard ID for the instrument"
+                },
+                "exchangeSegment": {
+                    "type": "string",
+                    "enum": ["NSE_EQ", "NSE_FNO", "BSE_EQ", "BSE_FNO", "MCX_COMM"],
+                    "description": "Exchange & segment"
+                },
+                "instrument": {
+                    "type": "string",
+                    "enum": ["EQUITY", "DERIVATIVES"],
+                    "description": "Instrument type"
                 },
-                "required": ["securityId", "exchangeSegment", "instrument", "fromDate", "toDate"],
+                "fromDate": {
+                    "type": "string",
+                    "description": "Start date in YYYY-MM-DD format",
+                    "pattern": "^\\d{4}-\\d{2}-\\d{2}$"
+                },
+                "toDate": {
+                    "type": "string",
+                    "description": "End date in YYYY-MM-DD format",
+                    "pattern": "^\\d{4}-\\d{2}-\\d{2}$"
+                },
+                "expiryCode": {
+                    "type": "integer",
+                    "description": "Expiry code for derivatives (optional)",
+                    "default": 0
+                },
+                "oi": {
+                    "type": "boolean",
+                    "description": "Include Open Interest data",
+                    "default": False
+                }
             },
-        ),
-        Tool(
-            name="get_intraday_data",
-            description="Get intraday OHLC data with minute-level granularity",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "securityId": {
-                        "type": "string",
-                        "description": "Exchange standard ID for the instrument"
-                    },
-                    "exchangeSegment": {
-                        "type": "string",
-                        "enum": ["NSE_EQ", "NSE_FNO", "BSE_EQ", "BSE_FNO", "MCX_COMM"],
-                        "description": "Exchange & segment"
-                    },
-                    "instrument": {
-                        "type": "string",
-                        "enum": ["EQUITY", "DERIVATIVES"],
-                        "description": "Instrument type"
-                    },
-                    "interval": {
-                        "type": "string",
-                        "enum": ["1", "5", "15", "25", "60"],
-                        "description": "Minute intervals (1, 5, 15, 25, 60)"
-                    },
-                    "fromDate": {
-                        "type": "string",
-                        "description": "Start datetime in YYYY-MM-DD HH:MM:SS format"
-                    },
-                    "toDate": {
-                        "type": "string",
-                        "description": "End datetime in YYYY-MM-DD HH:MM:SS format"
-                    },
-                    "oi": {
-                        "type": "boolean",
-                        "description": "Include Open Interest data",
-                        "default": False
-                    }
+            "required": ["securityId", "exchangeSegment", "instrument", "fromDate", "toDate"],
+        },
+    ),
+    Tool(
+        name="get_intraday_data",
+        description="Get intraday OHLC data with minute-level granularity",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "securityId": {
+                    "type": "string",
+                    "description": "Exchange standard ID for the instrument"
+                },
+                "exchangeSegment": {
+                    "type": "string",
+                    "enum": ["NSE_EQ", "NSE_FNO", "BSE_EQ", "BSE_FNO", "MCX_COMM"],
+                    "description": "Exchange & segment"
+                },
+                "instrument": {
+                    "type": "string",
+                    "enum": ["EQUITY", "DERIVATIVES"],
+                    "description": "Instrument type"
+                },
+                "interval": {
+                    "type": "string",
+                    "enum": ["1", "5", "15", "25", "60"],
+                    "description": "Minute intervals (1, 5, 15, 25, 60)"
                 },
-                "required": ["securityId", "exchangeSegment", "instrument", "interval", "fromDate", "toDate"],
+                "fromDate": {
+                    "type": "string",
+                    "description": "Start datetime in YYYY-MM-DD HH:MM:SS format"
+                },
+                "toDate": {
+                    "type": "string",
+                    "description": "End datetime in YYYY-MM-DD HH:MM:SS format"
+                },
+                "oi": {
+                    "type": "boolean",
+                    "description": "Include Open Interest data",
+                    "default": False
+                }
             },
-        ),
-        Tool(
-            name="get_instrument_master",
-            description="Get complete instrument master list or segment-wise list",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "exchangeSegment": {
-                        "type": "string",
-                        "enum": ["NSE_EQ", "NSE_FNO", "NSE_CURR", "BSE_EQ", "BSE_FNO", "BSE_CURR", "MCX_COMM"],
-                        "description": "Exchange segment (optional - if not provided, returns complete list)"
-                    },
-                    "detailed": {
-                        "type": "boolean",
-                        "description": "Get detailed instrument list with all columns",
-                        "default": False
-                    }
+            "required": ["securityId", "exchangeSegment", "instrument", "interval", "fromDate", "toDate"],
+        },
+    ),
+    Tool(
+        name="get_instrument_master",
+        description="Get complete instrument master list or segment-wise list",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "exchangeSegment": {
+                    "type": "string",
+                    "enum": ["NSE_EQ", "NSE_FNO", "NSE_CURR", "BSE_EQ", "BSE_FNO", "BSE_CURR", "MCX_COMM"],
+                    "description": "Exchange segment (optional - if not provided, returns complete list)"
                 },
-                "required": [],
+                "detailed": {
+                    "type": "boolean",
+                    "description": "Get detailed instrument list with all columns",
+                    "default": False
+                }
             },
-        ),
-        Tool(
-            name="search_instruments",
-            description="Search for instruments by symbol name or display name",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "query": {
-                        "type": "string",
-                        "description": "Search query (symbol name, company name, etc.)"
-                    },
-                    "exchangeSegment": {
-                        "type": "string",
-                        "enum": ["NSE_EQ", "NSE_FNO", "NSE_CURR", "BSE_EQ", "BSE_FNO", "BSE_CURR", "MCX_COMM"],
-                        "description": "Filter by exchange segment (optional)"
-                    },
-                    "instrument": {
-                        "type": "string",
-                        "enum": ["EQUITY", "OPTIDX", "FUTIDX", "FUTSTK", "OPTSTK"],
-                        "description": "Filter by instrument type (optional)"
-                    },
-                    "limit": {
-                        "type": "integer",
-                        "description": "Maximum number of results to return",
-                        "default": 20,
-                        "maximum": 100
-                    }
+            "required": [],
+        },
+    ),
+    Tool(
+        name="search_instruments",
+        description="Search for instruments by symbol name or display name",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "Search query (symbol name, company name, etc.)"
+                },
+                "exchangeSegment": {
+                    "type": "string",
+                    "enum": ["NSE_EQ", "NSE_FNO", "NSE_CURR", "BSE_EQ", "BSE_FNO", "BSE_CURR", "MCX_COMM"],
+                    "description": "Filter by exchange segment (optional)"
+                },
+                "instrument": {
+                    "type": "string",
+                    "enum": ["EQUITY", "OPTIDX", "FUTIDX", "FUTSTK", "OPTSTK"],
+                    "description": "Filter by instrument type (optional)"
                 },
-                "required": ["query"],
+                "limit": {
+                    "type": "integer",
+                    "description": "Maximum number of results to return",
+                    "default": 20,
+                    "maximum": 100
+                }
             },
-        ),
-        # TODO: Add more tools for market data and portfolio
-        # - get_positions
-        # - get_holdings
-        # - get_quotes
-        # - get_historical_data
-    ]
-
-
-@server.call_tool()
-async def call_tool(name: str, arguments: Dict[str, Any]) -> Sequence[TextContent]:
-    """Execute a tool"""
-    if not api_client:
-        return [TextContent(type="text", text="Error: Dhan API client not initialized")]
-
-    try:
-        if name == "get_profile":
-            data = await api_client.get("/profile")
-            return [TextContent(
-                type="text",
-                text=f"Profile Information:\n{json.dumps(data, indent=2)}"
-            )]
-
-        elif name == "get_ltp_by_symbol":
-            query = arguments["query"].lower()
-            exchange = arguments.get("exchangeSegment", "NSE_EQ")
-            client_id = arguments["client_id"]
-
-            # Step 1: Shortcut if in COMMON_IDS
-            sec_id = COMMON_IDS.get(query)
-            if not sec_id:
-                # Step 2: Search cached instruments
-                results = await fast_search_instrument(query)
-                if not results:
-                    return [TextContent(type="text", text=f"No match for {query}")]
-                sec_id = results[0].get("SEM_SMST_SECURITY_ID") or results[0].get("SEM_EXM_EXCH_ID")
-
-            # Step 3: Fetch LTP
-            resp = await api_client.session.post(
-                "/marketfeed/ltp",
-                json={exchange: [int(sec_id)]},
-                headers={**api_client.session.headers, "client-id": client_id}
-            )
-            resp.raise_for_status()
-            data = resp.json()
-
-            ltp = None
-            if data.get("status") == "success":
-                ltp = list(data["data"][exchange].values())[0].get("last_price")
-
-            return [TextContent(type="text", text=f"{query.upper()} LTP: ₹{ltp}" if ltp else "No LTP data")]
-
-
-        elif name == "validate_token":
-            data = await api_client.get("/profile")
-            validity = data.get("tokenValidity", "Unknown")
-            client_id = data.get("dhanClientId", "Unknown")
-            segments = data.get("activeSegment", "Unknown")
-            return [TextContent(
-                type="text",
-                text=f"Token Status:\nClient ID: {client_id}\nValid until: {validity}\nActive Segments: {segments}"
-            )]
-
-        elif name == "place_order":
-            # Clean the arguments to remove None values and empty strings
-            order_data = {k: v for k, v in arguments.items() if v is not None and v != ""}
-
-            # Convert numeric strings to proper types
-            if "quantity" in order_data:
-                order_data["quantity"] = str(order_data["quantity"])
-            if "price" in order_data and order_data["price"] != "":
-                order_data["price"] = str(order_data["price"])
-            if "triggerPrice" in order_data and order_data["triggerPrice"] != "":
-                order_data["triggerPrice"] = str(order_data["triggerPrice"])
-            if "disclosedQuantity" in order_data and order_data["disclosedQuantity"] != "":
-                order_data["disclosedQuantity"] = str(order_data["disclosedQuantity"])
-
-            # Set empty strings for optional fields that aren't provided
-            optional_fields = ["correlationId", "price", "triggerPrice", "disclosedQuantity", "amoTime",
-                               "boProfitValue", "boStopLossValue"]
-            for field in optional_fields:
-                if field not in order_data:
-                    order_data[field] = ""
-
-            # Set default values
-            order_data.setdefault("afterMarketOrder", False)
-
-            data = await api_client.post("/orders", order_data)
-            return [TextContent(
-                type="text",
-                text=f"Order Placed Successfully:\nOrder ID: {data.get('orderId')}\nStatus: {data.get('orderStatus')}"
-            )]
-
-        elif name == "modify_order":
-            order_id = arguments.pop("orderId")
-            modify_data = {k: v for k, v in arguments.items() if v is not None and v != ""}
-
-            # Convert numeric fields to strings as expected by API
-            if "quantity" in modify_data:
-                modify_data["quantity"] = str(modify_data["quantity"])
-            if "price" in modify_data:
-                modify_data["price"] = str(modify_data["price"])
-            if "triggerPrice" in modify_data:
-                modify_data["triggerPrice"] = str(modify_data["triggerPrice"])
-            if "disclosedQuantity" in modify_data:
-                modify_data["disclosedQuantity"] = str(modify_data["disclosedQuantity"])
-
-            # Set empty strings for optional fields
-            optional_fields = ["legName", "triggerPrice", "disclosedQuantity"]
-            for field in optional_fields:
-                if field not in modify_data:
-                    modify_data[field] = ""
-
-            data = await api_client.put(f"/orders/{order_id}", modify_data)
-            return [TextContent(
-                type="text",
-                text=f"Order Modified Successfully:\nOrder ID: {data.get('orderId')}\nStatus: {data.get('orderStatus')}"
-            )]
-
-        elif name == "cancel_order":
-            order_id = arguments["orderId"]
-            data = await api_client.delete(f"/orders/{order_id}")
-            return [TextContent(
-                type="text",
-                text=f"Order Cancelled:\nOrder ID: {data.get('orderId')}\nStatus: {data.get('orderStatus')}"
-            )]
-
-        elif name == "slice_order":
-            # Clean the arguments similar to place_order
-            order_data = {k: v for k, v in arguments.items() if v is not None and v != ""}
-
-            # Convert numeric strings to proper types
-            if "quantity" in order_data:
-                order_data["quantity"] = str(order_data["quantity"])
-            if "price" in order_data and order_data["price"] != "":
-                order_data["price"] = str(order_data["price"])
-            if "triggerPrice" in order_data and order_data["triggerPrice"] != "":
-                order_data["triggerPrice"] = str(order_data["triggerPrice"])
-            if "disclosedQuantity" in order_data and order_data["disclosedQuantity"] != "":
-                order_data["disclosedQuantity"] = str(order_data["disclosedQuantity"])
-
-            # Set empty strings for optional fields
-            optional_fields = ["correlationId", "price", "triggerPrice", "disclosedQuantity", "amoTime",
-                               "boProfitValue", "boStopLossValue"]
-            for field in optional_fields:
-                if field not in order_data:
-                    order_data[field] = ""
-
-            order_data.setdefault("afterMarketOrder", False)
-
-            data = await api_client.post("/orders/slicing", order_data)
-            order_ids = [order.get('orderId') for order in data]
-            return [TextContent(
-                type="text",
-                text=f"Orders Sliced Successfully:\n{json.dumps(data, indent=2)}\nOrder IDs: {', '.join(order_ids)}"
-            )]
-
-        elif name == "get_orders":
-            data = await api_client.get("/orders")
-            if isinstance(data, list) and len(data) > 0:
-                summary = f"Total Orders: {len(data)}\n\n"
-                for order in data[:10]:  # Show first 10 orders
-                    summary += f"Order ID: {order.get('orderId')}\n"
-                    summary += f"Symbol: {order.get('tradingSymbol', 'N/A')}\n"
-                    summary += f"Type: {order.get('transactionType')} {order.get('quantity')} @ {order.get('price', 'Market')}\n"
-                    summary += f"Status: {order.get('orderStatus')}\n"
-                    summary += f"Time: {order.get('createTime')}\n\n"
-
-                if len(data) > 10:
-                    summary += f"... and {len(data) - 10} more orders"
-
-                return [TextContent(type="text", text=summary)]
-            else:
-                return [TextContent(type="text", text="No orders found for today")]
-
-        elif name == "get_order_by_id":
-            order_id = arguments["orderId"]
-            data = await api_client.get(f"/orders/{order_id}")
-            return [TextContent(
-                type="text",
-                text=f"Order Details:\n{json.dumps(data, indent=2)}"
-            )]
-
-        elif name == "get_order_by_correlation_id":
-            correlation_id = arguments["correlationId"]
-            data = await api_client.get(f"/orders/external/{correlation_id}")
-            return [TextContent(
-                type="text",
-                text=f"Order Details:\n{json.dumps(data, indent=2)}"
-            )]
-
-        elif name == "get_trades":
-            data = await api_client.get("/trades")
-            if isinstance(data, list) and len(data) > 0:
-                summary = f"Total Trades: {len(data)}\n\n"
-                total_value = 0
-                for trade in data[:10]:  # Show first 10 trades
-                    trade_value = trade.get('tradedQuantity', 0) * trade.get('tradedPrice', 0)
-                    total_value += trade_value
-                    summary += f"Order ID: {trade.get('orderId')}\n"
-                    summary += f"Symbol: {trade.get('tradingSymbol', 'N/A')}\n"
-                    summary += f"Trade: {trade.get('transactionType')} {trade.get('tradedQuantity')} @ ₹{trade.get('tradedPrice')}\n"
-                    summary += f"Value: ₹{trade_value:.2f}\n"
-                    summary += f"Time: {trade.get('exchangeTime')}\n\n"
-
-                if len(data) > 10:
-                    summary += f"... and {len(data) - 10} more trades\n"
-
-                summary += f"Total Value (first 10): ₹{total_value:.2f}"
-                return [TextContent(type="text", text=summary)]
-            else:
-                return [TextContent(type="text", text="No trades found for today")]
-
-        elif name == "get_trades_by_order_id":
-            order_id = arguments["orderId"]
-            data = await api_client.get(f"/trades/{order_id}")
-            if isinstance(data, list):
-                return [TextContent(
-                    type="text",
-                    text=f"Trades for Order ID {order_id}:\n{json.dumps(data, indent=2)}"
-                )]
-            else:
-                return [TextContent(
-                    type="text",
-                    text=f"Trade Details for Order ID {order_id}:\n{json.dumps(data, indent=2)}"
-                )]
-
-        elif name == "calculate_margin":
-            # Prepare margin calculation data
-            margin_data = {k: v for k, v in arguments.items() if v is not None}
-
-            # Ensure triggerPrice is included (set to 0 if not provided)
-            if "triggerPrice" not in margin_data:
-                margin_data["triggerPrice"] = 0
-
-            data = await api_client.post("/margincalculator", margin_data)
-
-            # Format the response nicely
-            response_text = "Margin Calculation Result:\n"
-            response_text += f"Total Margin Required: ₹{data.get('totalMargin', 0):.2f}\n"
-            response_text += f"Available Balance: ₹{data.get('availableBalance', 0):.2f}\n"
-            response_text += f"Span Margin: ₹{data.get('spanMargin', 0):.2f}\n"
-            response_text += f"Exposure Margin: ₹{data.get('exposureMargin', 0):.2f}\n"
-            response_text += f"Variable Margin: ₹{data.get('variableMargin', 0):.2f}\n"
-            response_text += f"Brokerage: ₹{data.get('brokerage', 0):.2f}\n"
-            response_text += f"Leverage: {data.get('leverage', 'N/A')}x\n"
-
-            insufficient = data.get('insufficientBalance', 0)
-            if insufficient > 0:
-                response_text += f"⚠️ Insufficient Balance: ₹{insufficient:.2f}\n"
-            else:
-                response_text += "✅ Sufficient balance available\n"
-
-            return [TextContent(type="text", text=response_text)]
-
-        elif name == "get_ledger":
-            from_date = arguments["from_date"]
-            to_date = arguments["to_date"]
-            params = {"from-date": from_date, "to-date": to_date}
-
-            data = await api_client.get("/ledger", params=params)
-
-            if isinstance(data, list) and len(data) > 0:
-                response_text = f"Ledger Report ({from_date} to {to_date}):\n"
-                response_text += f"Total Entries: {len(data)}\n\n"
-
-                total_credits = sum(float(entry.get('credit', 0)) for entry in data)
-                total_debits = sum(float(entry.get('debit', 0)) for entry in data)
-
-                response_text += f"Summary:\n"
-                response_text += f"Total Credits: ₹{total_credits:,.2f}\n"
-                response_text += f"Total Debits: ₹{total_debits:,.2f}\n"
-                response_text += f"Net: ₹{(total_credits - total_debits):,.2f}\n\n"
-
-                response_text += "Recent Entries:\n"
-                for entry in data[:10]:  # Show first 10 entries
-                    response_text += f"Date: {entry.get('voucherdate')}\n"
-                    response_text += f"Description: {entry.get('narration')}\n"
-                    response_text += f"Type: {entry.get('voucherdesc')}\n"
-                    if float(entry.get('credit', 0)) > 0:
-                        response_text += f"Credit: ₹{float(entry.get('credit')):,.2f}\n"
-                    if float(entry.get('debit', 0)) > 0:
-                        response_text += f"Debit: ₹{float(entry.get('debit')):,.2f}\n"
-                    response_text += f"Balance: ₹{float(entry.get('runbal', 0)):,.2f}\n\n"
-
-                if len(data) > 10:
-                    response_text += f"... and {len(data) - 10} more entries"
+            "required": ["query"],
+        },
+    ),
+    # TODO: Add more tools for market data and portfolio
+    # - get_positions
+    # - get_holdings
+    # - get_quotes
+    # - get_historical_data
+]
+
+# Argument validators compiled once from the schemas above; use_default=False
+# so validation never injects schema defaults into the caller's arguments
+_VALIDATORS = {
+    tool.name: fastjsonschema.compile(tool.inputSchema, use_default=False)
+    for tool in _TOOLS
+}
 
-                return [TextContent(type="text", text=response_text)]
-            else:
-                return [TextContent(type="text", text=f"No ledger entries found for {from_date} to {to_date}")]
 
-        elif name == "get_historical_trades":
-            from_date = arguments["from_date"]
-            to_date = arguments["to_date"]
-            page = arguments.get("page", 0)
+@server.list_tools()
+async def list_tools() -> List[Tool]:
+    """List available tools"""
+    return _TOOLS
 
-            endpoint = f"/trades/{from_date}/{to_date}/{page}"
-            data = await api_client.get(endpoint)
 
-            if isinstance(data, list) and len(data) > 0:
-                response_text = f"Historical Trades ({from_date} to {to_date}, Page {page}):\n"
-                response_text += f"Total Trades: {len(data)}\n\n"
+# The order APIs take numbers as strings, and expect optional fields present but blank
+_NUMERIC_ORDER_FIELDS = ("quantity", "price", "triggerPrice", "disclosedQuantity")
+_OPTIONAL_ORDER_FIELDS = ("correlationId", "price", "triggerPrice", "disclosedQuantity", "amoTime",
+                          "boProfitValue", "boStopLossValue")
+_OPTIONAL_MODIFY_FIELDS = ("legName", "triggerPrice", "disclosedQuantity")
 
-                total_value = 0
-                for trade in data:
-                    trade_value = trade.get('tradedQuantity', 0) * trade.get('tradedPrice', 0)
-                    total_value += trade_value
 
-                response_text += f"Total Trade Value: ₹{total_value:,.2f}\n\n"
+def _normalize_order(arguments: Dict[str, Any], optional_fields: Sequence[str]) -> Dict[str, Any]:
+    """Drop empty arguments, stringify numeric fields and blank-fill the optional ones"""
+    order_data = dict.fromkeys(optional_fields, "")
+    order_data.update((k, v) for k, v in arguments.items() if v is not None and v != "")
+    for field in _NUMERIC_ORDER_FIELDS:
+        if field in order_data and order_data[field] != "":
+            order_data[field] = str(order_data[field])
+    return order_data
 
-                response_text += "Trade Details:\n"
-                for trade in data[:10]:  # Show first 10 trades
-                    trade_value = trade.get('tradedQuantity', 0) * trade.get('tradedPrice', 0)
-                    response_text += f"Symbol: {trade.get('customSymbol', 'N/A')}\n"
-                    response_text += f"Trade: {trade.get('transactionType')} {trade.get('tradedQuantity')} @ ₹{trade.get('tradedPrice')}\n"
-                    response_text += f"Value: ₹{trade_value:.2f}\n"
-                    response_text += f"Time: {trade.get('exchangeTime')}\n"
-                    response_text += f"Charges: STT: ₹{trade.get('stt', 0)}, Brokerage: ₹{trade.get('brokerageCharges', 0)}\n\n"
 
-                if len(data) > 10:
-                    response_text += f"... and {len(data) - 10} more trades"
+# --------------------------
+# Tool handlers
+# --------------------------
 
-                return [TextContent(type="text", text=response_text)]
+async def _handle_get_profile(api_client: DhanAPIClient, arguments: Dict[str, Any]) -> List[TextContent]:
+    """Get user profile and account information"""
+    data = await api_client.get("/profile")
+    return [TextContent(
+        type="text",
+        text=f"Profile Information:\n{_dumps(data)}"
+    )]
+
+
+async def _handle_get_ltp_by_symbol(api_client: DhanAPIClient, arguments: Dict[str, Any]) -> List[TextContent]:
+    """Fetch Last Traded Price (LTP) directly by symbol or company name"""
+    query = arguments["query"].lower()
+    exchange = arguments.get("exchangeSegment", "NSE_EQ")
+    client_id = arguments["client_id"]
+
+    # Step 1: Resolve the security id, popular symbols without any search
+    sec_id = _COMMON_IDS_INT.get(query.strip())
+    if sec_id is None:
+        results = await fast_search_instrument(query)
+        if not results:
+            return [TextContent(type="text", text=f"No match for {query}")]
+        sec_id = int(results[0].get("SEM_SMST_SECURITY_ID") or results[0].get("SEM_EXM_EXCH_ID"))
+
+    # Step 2: Fetch LTP (recently seen quotes come from the client's cache)
+    data = await api_client.quotes("/marketfeed/ltp", {exchange: [sec_id]}, client_id)
+
+    ltp = None
+    if data.get("status") == "success":
+        quote = data["data"].get(exchange, {}).get(str(sec_id))
+        ltp = quote.get("last_price") if quote else None
+
+    return [TextContent(type="text", text=f"{query.upper()} LTP: ₹{ltp}" if ltp else "No LTP data")]
+
+
+async def _handle_validate_token(api_client: DhanAPIClient, arguments: Dict[str, Any]) -> List[TextContent]:
+    """Validate the current access token"""
+    data = await api_client.get("/profile")
+    validity = data.get("tokenValidity", "Unknown")
+    client_id = data.get("dhanClientId", "Unknown")
+    segments = data.get("activeSegment", "Unknown")
+    return [TextContent(
+        type="text",
+        text=f"Token Status:\nClient ID: {client_id}\nValid until: {validity}\nActive Segments: {segments}"
+    )]
+
+
+async def _handle_place_order(api_client: DhanAPIClient, arguments: Dict[str, Any]) -> List[TextContent]:
+    """Place a new trading order"""
+    order_data = _normalize_order(arguments, _OPTIONAL_ORDER_FIELDS)
+    order_data.setdefault("afterMarketOrder", False)
+
+    data = await api_client.post("/orders", order_data)
+    return [TextContent(
+        type="text",
+        text=f"Order Placed Successfully:\nOrder ID: {data.get('orderId')}\nStatus: {data.get('orderStatus')}"
+    )]
+
+
+async def _handle_modify_order(api_client: DhanAPIClient, arguments: Dict[str, Any]) -> List[TextContent]:
+    """Modify a pending order"""
+    order_id = arguments.pop("orderId")
+    modify_data = _normalize_order(arguments, _OPTIONAL_MODIFY_FIELDS)
+
+    data = await api_client.put(f"/orders/{order_id}", modify_data)
+    return [TextContent(
+        type="text",
+        text=f"Order Modified Successfully:\nOrder ID: {data.get('orderId')}\nStatus: {data.get('orderStatus')}"
+    )]
+
+
+async def _handle_cancel_order(api_client: DhanAPIClient, arguments: Dict[str, Any]) -> List[TextContent]:
+    """Cancel a pending order"""
+    order_id = arguments["orderId"]
+    data = await api_client.delete(f"/orders/{order_id}")
+    return [TextContent(
+        type="text",
+        text=f"Order Cancelled:\nOrder ID: {data.get('orderId')}\nStatus: {data.get('orderStatus')}"
+    )]
+
+
+async def _handle_slice_order(api_client: DhanAPIClient, arguments: Dict[str, Any]) -> List[TextContent]:
+    """Slice order into multiple legs over freeze limit"""
+    order_data = _normalize_order(arguments, _OPTIONAL_ORDER_FIELDS)
+    order_data.setdefault("afterMarketOrder", False)
+
+    data = await api_client.post("/orders/slicing", order_data)
+    order_ids = [order.get('orderId') for order in data]
+    return [TextContent(
+        type="text",
+        text=f"Orders Sliced Successfully:\n{_dumps(data)}\nOrder IDs: {', '.join(order_ids)}"
+    )]
+
+
+async def _handle_get_orders(api_client: DhanAPIClient, arguments: Dict[str, Any]) -> List[TextContent]:
+    """Retrieve the list of all orders for the day"""
+    data = await api_client.get("/orders")
+    if isinstance(data, list) and len(data) > 0:
+        parts = [f"Total Orders: {len(data)}\n\n"]
+        for order in islice(data, 10):  # Show first 10 orders
+            parts.append(f"Order ID: {order.get('orderId')}\n")
+            parts.append(f"Symbol: {order.get('tradingSymbol', 'N/A')}\n")
+            parts.append(f"Type: {order.get('transactionType')} {order.get('quantity')} @ {order.get('price', 'Market')}\n")
+            parts.append(f"Status: {order.get('orderStatus')}\n")
+            parts.append(f"Time: {order.get('createTime')}\n\n")
+
+        if len(data) > 10:
+            parts.append(f"... and {len(data) - 10} more orders")
+
+        return [TextContent(type="text", text="".join(parts))]
+    else:
+        return [TextContent(type="text", text="No orders found for today")]
+
+
+async def _handle_get_order_by_id(api_client: DhanAPIClient, arguments: Dict[str, Any]) -> List[TextContent]:
+    """Retrieve the status of a specific order by order ID"""
+    order_id = arguments["orderId"]
+    data = await api_client.get(f"/orders/{order_id}")
+    return [TextContent(
+        type="text",
+        text=f"Order Details:\n{_dumps(data)}"
+    )]
+
+
+async def _handle_get_order_by_correlation_id(api_client: DhanAPIClient, arguments: Dict[str, Any]) -> List[TextContent]:
+    """Retrieve the status of an order by correlation ID"""
+    correlation_id = arguments["correlationId"]
+    data = await api_client.get(f"/orders/external/{correlation_id}")
+    return [TextContent(
+        type="text",
+        text=f"Order Details:\n{_dumps(data)}"
+    )]
+
+
+async def _handle_get_trades(api_client: DhanAPIClient, arguments: Dict[str, Any]) -> List[TextContent]:
+    """Retrieve the list of all trades for the day"""
+    data = await api_client.get("/trades")
+    if isinstance(data, list) and len(data) > 0:
+        parts = [f"Total Trades: {len(data)}\n\n"]
+        total_value = 0
+        for trade in islice(data, 10):  # Show first 10 trades
+            trade_value = trade.get('tradedQuantity', 0) * trade.get('tradedPrice', 0)
+            total_value += trade_value
+            parts.append(f"Order ID: {trade.get('orderId')}\n")
+            parts.append(f"Symbol: {trade.get('tradingSymbol', 'N/A')}\n")
+            parts.append(f"Trade: {trade.get('transactionType')} {trade.get('tradedQuantity')} @ ₹{trade.get('tradedPrice')}\n")
+            parts.append(f"Value: ₹{trade_value:.2f}\n")
+            parts.append(f"Time: {trade.get('exchangeTime')}\n\n")
+
+        if len(data) > 10:
+            parts.append(f"... and {len(data) - 10} more trades\n")
+
+        parts.append(f"Total Value (first 10): ₹{total_value:.2f}")
+        return [TextContent(type="text", text="".join(parts))]
+    else:
+        return [TextContent(type="text", text="No trades found for today")]
+
+
+async def _handle_get_trades_by_order_id(api_client: DhanAPIClient, arguments: Dict[str, Any]) -> List[TextContent]:
+    """Retrieve trade details for a specific order ID"""
+    order_id = arguments["orderId"]
+    data = await api_client.get(f"/trades/{order_id}")
+    if isinstance(data, list):
+        return [TextContent(
+            type="text",
+            text=f"Trades for Order ID {order_id}:\n{_dumps(data)}"
+        )]
+    else:
+        return [TextContent(
+            type="text",
+            text=f"Trade Details for Order ID {order_id}:\n{_dumps(data)}"
+        )]
+
+
+async def _handle_calculate_margin(api_client: DhanAPIClient, arguments: Dict[str, Any]) -> List[TextContent]:
+    """Calculate margin requirement for any order before placing it"""
+    # Prepare margin calculation data
+    margin_data = {k: v for k, v in arguments.items() if v is not None}
+
+    # Ensure triggerPrice is included (set to 0 if not provided)
+    if "triggerPrice" not in margin_data:
+        margin_data["triggerPrice"] = 0
+
+    data = await api_client.post("/margincalculator", margin_data)
+
+    # Format the response nicely
+    parts = ["Margin Calculation Result:\n"]
+    parts.append(f"Total Margin Required: ₹{data.get('totalMargin', 0):.2f}\n")
+    parts.append(f"Available Balance: ₹{data.get('availableBalance', 0):.2f}\n")
+    parts.append(f"Span Margin: ₹{data.get('spanMargin', 0):.2f}\n")
+    parts.append(f"Exposure Margin: ₹{data.get('exposureMargin', 0):.2f}\n")
+    parts.append(f"Variable Margin: ₹{data.get('variableMargin', 0):.2f}\n")
+    parts.append(f"Brokerage: ₹{data.get('brokerage', 0):.2f}\n")
+    parts.append(f"Leverage: {data.get('leverage', 'N/A')}x\n")
+
+    insufficient = data.get('insufficientBalance', 0)
+    if insufficient > 0:
+        parts.append(f"⚠️ Insufficient Balance: ₹{insufficient:.2f}\n")
+    else:
+        parts.append("✅ Sufficient balance available\n")
+
+    return [TextContent(type="text", text="".join(parts))]
+
+
+async def _handle_get_ledger(api_client: DhanAPIClient, arguments: Dict[str, Any]) -> List[TextContent]:
+    """Retrieve Trading Account ledger report with credit/debit details"""
+    from_date = arguments["from_date"]
+    to_date = arguments["to_date"]
+    params = {"from-date": from_date, "to-date": to_date}
+
+    data = await api_client.get("/ledger", params=params)
+
+    if isinstance(data, list) and len(data) > 0:
+        parts = [f"Ledger Report ({from_date} to {to_date}):\n"]
+        parts.append(f"Total Entries: {len(data)}\n\n")
+
+        # Amounts arrive as strings; numpy parses them once, in C, for both the
+        # totals and the entries listed below
+        credits = np.array([entry.get('credit') or 0 for entry in data], dtype=np.float64)
+        debits = np.array([entry.get('debit') or 0 for entry in data], dtype=np.float64)
+        total_credits = float(credits.sum())
+        total_debits = float(debits.sum())
+
+        parts.append(f"Summary:\n")
+        parts.append(f"Total Credits: ₹{total_credits:,.2f}\n")
+        parts.append(f"Total Debits: ₹{total_debits:,.2f}\n")
+        parts.append(f"Net: ₹{(total_credits - total_debits):,.2f}\n\n")
+
+        parts.append("Recent Entries:\n")
+        for i, entry in enumerate(islice(data, 10)):  # Show first 10 entries
+            parts.append(f"Date: {entry.get('voucherdate')}\n")
+            parts.append(f"Description: {entry.get('narration')}\n")
+            parts.append(f"Type: {entry.get('voucherdesc')}\n")
+            credit, debit = credits[i], debits[i]
+            if credit > 0:
+                parts.append(f"Credit: ₹{credit:,.2f}\n")
+            if debit > 0:
+                parts.append(f"Debit: ₹{debit:,.2f}\n")
+            parts.append(f"Balance: ₹{float(entry.get('runbal', 0)):,.2f}\n\n")
+
+        if len(data) > 10:
+            parts.append(f"... and {len(data) - 10} more entries")
+
+        return [TextContent(type="text", text="".join(parts))]
+    else:
+        return [TextContent(type="text", text=f"No ledger entries found for {from_date} to {to_date}")]
+
+
+async def _handle_get_historical_trades(api_client: DhanAPIClient, arguments: Dict[str, Any]) -> List[TextContent]:
+    """Retrieve detailed historical trade data for a date range"""
+    from_date = arguments["from_date"]
+    to_date = arguments["to_date"]
+    page = arguments.get("page", 0)
+
+    endpoint = f"/trades/{from_date}/{to_date}/{page}"
+    data = await api_client.get(endpoint)
+
+    if isinstance(data, list) and len(data) > 0:
+        parts = [f"Historical Trades ({from_date} to {to_date}, Page {page}):\n"]
+        parts.append(f"Total Trades: {len(data)}\n\n")
+
+        quantities = np.array([trade.get('tradedQuantity', 0) for trade in data], dtype=np.float64)
+        prices = np.array([trade.get('tradedPrice', 0) for trade in data], dtype=np.float64)
+        total_value = float(np.dot(quantities, prices))
+
+        parts.append(f"Total Trade Value: ₹{total_value:,.2f}\n\n")
+
+        parts.append("Trade Details:\n")
+        for trade in islice(data, 10):  # Show first 10 trades
+            trade_value = trade.get('tradedQuantity', 0) * trade.get('tradedPrice', 0)
+            parts.append(f"Symbol: {trade.get('customSymbol', 'N/A')}\n")
+            parts.append(f"Trade: {trade.get('transactionType')} {trade.get('tradedQuantity')} @ ₹{trade.get('tradedPrice')}\n")
+            parts.append(f"Value: ₹{trade_value:.2f}\n")
+            parts.append(f"Time: {trade.get('exchangeTime')}\n")
+            parts.append(f"Charges: STT: ₹{trade.get('stt', 0)}, Brokerage: ₹{trade.get('brokerageCharges', 0)}\n\n")
+
+        if len(data) > 10:
+            parts.append(f"... and {len(data) - 10} more trades")
+
+        return [TextContent(type="text", text="".join(parts))]
+    else:
+        return [TextContent(type="text", text=f"No historical trades found for {from_date} to {to_date}")]
+
+
+async def _handle_market_feed(api_client: DhanAPIClient, arguments: Dict[str, Any],
+                              name: str) -> List[TextContent]:
+    """Get LTP, OHLC or full quote data for instruments, depending on the tool ``name``"""
+    instruments = arguments["instruments"]
+    client_id = arguments["client_id"]
+
+    # Map tool name to API endpoint
+    endpoint_map = {
+        "get_market_ltp": "/marketfeed/ltp",
+        "get_market_ohlc": "/marketfeed/ohlc",
+        "get_market_depth": "/marketfeed/quote"
+    }
+
+    endpoint = endpoint_map[name]
+
+    # Convert security IDs to integers for API request, dropping repeats
+    api_instruments = {}
+    for segment, ids in instruments.items():
+        api_instruments[segment] = sorted({int(id) for id in ids})
+
+    # Recently seen quotes are served from memory; concurrent calls to
+    # the same endpoint share one upstream request for the rest
+    data = await api_client.quotes(endpoint, api_instruments, client_id)
+
+    if data.get("status") == "success" and "data" in data:
+        parts = [f"Market Data ({name.replace('get_market_', '').upper()}):\n\n"]
+
+        for segment, segment_data in data["data"].items():
+            parts.append(f"{segment}:\n")
+            for security_id, quotes in segment_data.items():
+                parts.append(f"  Security ID {security_id}:\n")
+
+                if "last_price" in quotes:
+                    parts.append(f"    LTP: ₹{quotes['last_price']}\n")
+
+                if "ohlc" in quotes:
+                    ohlc = quotes["ohlc"]
+                    parts.append(f"    Open: ₹{ohlc.get('open', 0)}\n")
+                    parts.append(f"    High: ₹{ohlc.get('high', 0)}\n")
+                    parts.append(f"    Low: ₹{ohlc.get('low', 0)}\n")
+                    parts.append(f"    Close: ₹{ohlc.get('close', 0)}\n")
+
+                if "volume" in quotes:
+                    parts.append(f"    Volume: {quotes['volume']:,}\n")
+
+                if "depth" in quotes:
+                    depth = quotes["depth"]
+                    parts.append(f"    Buy Qty: {quotes.get('buy_quantity', 0):,}\n")
+                    parts.append(f"    Sell Qty: {quotes.get('sell_quantity', 0):,}\n")
+
+                parts.append("\n")
+
+        return [TextContent(type="text", text="".join(parts))]
+    else:
+        return [TextContent(type="text", text=f"Failed to fetch market data: {data}")]
+
+
+async def _handle_get_historical_data(api_client: DhanAPIClient, arguments: Dict[str, Any]) -> List[TextContent]:
+    """Get daily historical OHLC data for an instrument"""
+    historical_data = {k: v for k, v in arguments.items() if v is not None}
+    data = await api_client.post("/charts/historical", historical_data)
+
+    if "open" in data and len(data["open"]) > 0:
+        parts = [f"Historical Data ({arguments['securityId']}):\n"]
+        parts.append(f"Period: {arguments['fromDate']} to {arguments['toDate']}\n")
+        parts.append(f"Data Points: {len(data['open'])}\n\n")
+
+        # Show last few data points
+        for i in range(min(5, len(data["open"]))):
+            idx = len(data["open"]) - 1 - i
+            parts.append(f"Date: {data['timestamp'][idx]} (epoch)\n")
+            parts.append(f"OHLC: O:₹{data['open'][idx]} H:₹{data['high'][idx]} L:₹{data['low'][idx]} C:₹{data['close'][idx]}\n")
+            parts.append(f"Volume: {data['volume'][idx]:,}\n\n")
+
+        return [TextContent(type="text", text="".join(parts))]
+    else:
+        return [TextContent(type="text", text="No historical data found for the specified period")]
+
+
+async def _handle_get_intraday_data(api_client: DhanAPIClient, arguments: Dict[str, Any]) -> List[TextContent]:
+    """Get intraday OHLC data with minute-level granularity"""
+    intraday_data = {k: v for k, v in arguments.items() if v is not None}
+    data = await api_client.post("/charts/intraday", intraday_data)
+
+    if "open" in data and len(data["open"]) > 0:
+        parts = [f"Intraday Data ({arguments['securityId']}):\n"]
+        parts.append(f"Interval: {arguments['interval']} minute(s)\n")
+        parts.append(f"Period: {arguments['fromDate']} to {arguments['toDate']}\n")
+        parts.append(f"Data Points: {len(data['open'])}\n\n")
+
+        # Show last few data points
+        for i in range(min(5, len(data["open"]))):
+            idx = len(data["open"]) - 1 - i
+            parts.append(f"Time: {data['timestamp'][idx]} (epoch)\n")
+            parts.append(f"OHLC: O:₹{data['open'][idx]} H:₹{data['high'][idx]} L:₹{data['low'][idx]} C:₹{data['close'][idx]}\n")
+            parts.append(f"Volume: {data['volume'][idx]:,}\n\n")
+
+        return [TextContent(type="text", text="".join(parts))]
+    else:
+        return [TextContent(type="text", text="No intraday data found for the specified period")]
+
+
+async def _handle_get_instrument_master(api_client: DhanAPIClient, arguments: Dict[str, Any]) -> List[TextContent]:
+    """Get complete instrument master list or segment-wise list"""
+    exchange_segment = arguments.get("exchangeSegment")
+    detailed = arguments.get("detailed", False)
+
+    if exchange_segment:
+        # Get segment-specific instrument list
+        data = await api_client.get(f"/instrument/{exchange_segment}")
+        parts = [f"Instrument Master for {exchange_segment}:\n"]
+        parts.append(f"Total Instruments: {len(data) if isinstance(data, list) else 'Unknown'}\n\n")
+
+        if isinstance(data, list) and len(data) > 0:
+            # Show first 10 instruments
+            for instrument in islice(data, 10):
+                parts.append(f"Security ID: {instrument.get('SEM_EXM_EXCH_ID', 'N/A')}\n")
+                parts.append(f"Symbol: {instrument.get('SEM_CUSTOM_SYMBOL', 'N/A')}\n")
+                parts.append(f"Name: {instrument.get('SM_SYMBOL_NAME', 'N/A')}\n")
+                parts.append(f"Instrument: {instrument.get('SEM_INSTRUMENT_NAME', 'N/A')}\n")
+                parts.append(f"Lot Size: {instrument.get('SEM_LOT_UNITS', 'N/A')}\n\n")
+
+            if len(data) > 10:
+                parts.append(f"... and {len(data) - 10} more instruments")
+
+        return [TextContent(type="text", text="".join(parts))]
+    else:
+        # Get complete master list (CSV format)
+        if detailed:
+            csv_url = "https://images.dhan.co/api-data/api-scrip-master-detailed.csv"
+        else:
+            csv_url = "https://images.dhan.co/api-data/api-scrip-master.csv"
+
+        # Streamed to a revalidated disk cache; only the sample rows and
+        # the record count are kept in memory
+        lines, total = await fetch_instrument_csv(csv_url)
+        parts = [f"Complete Instrument Master ({'Detailed' if detailed else 'Compact'}):\n"]
+        parts.append(f"Total Records: {total}\n")  # Excluding header
+        parts.append(f"Source: {csv_url}\n\n")
+        parts.append("Sample Data (First 5 records):\n")
+
+        # Show header and first 5 data rows
+        for i, line in enumerate(lines[:6]):
+            if i == 0:
+                parts.append(f"Headers: {line}\n\n")
             else:
-                return [TextContent(type="text", text=f"No historical trades found for {from_date} to {to_date}")]
-
-        elif name in ["get_market_ltp", "get_market_ohlc", "get_market_depth"]:
-            instruments = arguments["instruments"]
-            client_id = arguments["client_id"]
-
-            # Map tool name to API endpoint
-            endpoint_map = {
-                "get_market_ltp": "/marketfeed/ltp",
-                "get_market_ohlc": "/marketfeed/ohlc",
-                "get_market_depth": "/marketfeed/quote"
-            }
-
-            endpoint = endpoint_map[name]
-
-            # Add client-id header for market data requests
-            headers = {"client-id": client_id}
-
-            # Convert security IDs to integers for API request
-            api_instruments = {}
-            for segment, ids in instruments.items():
-                api_instruments[segment] = [int(id) for id in ids]
-
-            # Make request with custom headers
-            response = await api_client.session.post(
-                endpoint,
-                json=api_instruments,
-                headers={**api_client.session.headers, **headers}
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            if data.get("status") == "success" and "data" in data:
-                response_text = f"Market Data ({name.replace('get_market_', '').upper()}):\n\n"
-
-                for segment, segment_data in data["data"].items():
-                    response_text += f"{segment}:\n"
-                    for security_id, quotes in segment_data.items():
-                        response_text += f"  Security ID {security_id}:\n"
-
-                        if "last_price" in quotes:
-                            response_text += f"    LTP: ₹{quotes['last_price']}\n"
-
-                        if "ohlc" in quotes:
-                            ohlc = quotes["ohlc"]
-                            response_text += f"    Open: ₹{ohlc.get('open', 0)}\n"
-                            response_text += f"    High: ₹{ohlc.get('high', 0)}\n"
-                            response_text += f"    Low: ₹{ohlc.get('low', 0)}\n"
-                            response_text += f"    Close: ₹{ohlc.get('close', 0)}\n"
-
-                        if "volume" in quotes:
-                            response_text += f"    Volume: {quotes['volume']:,}\n"
-
-                        if "depth" in quotes:
-                            depth = quotes["depth"]
-                            response_text += f"    Buy Qty: {quotes.get('buy_quantity', 0):,}\n"
-                            response_text += f"    Sell Qty: {quotes.get('sell_quantity', 0):,}\n"
+                parts.append(f"Record {i}: {line}\n")
+
+        parts.append(f"\n... and {total - CSV_SAMPLE_ROWS} more records")
+        parts.append(f"\n\nTo process this data, use the CSV URL: {csv_url}")
+
+        return [TextContent(type="text", text="".join(parts))]
+
+
+# Bound once, so each result row is a single format_map call
+_format_search_row = (
+    "Security ID: {SEM_EXM_EXCH_ID}\n"
+    "Symbol: {SEM_CUSTOM_SYMBOL}\n"
+    "Name: {SM_SYMBOL_NAME}\n"
+    "Exchange: {SEM_SEGMENT}\n"
+    "Instrument: {SEM_INSTRUMENT_NAME}\n"
+    "Lot Size: {SEM_LOT_UNITS}\n\n"
+).format_map
+_SEARCH_ROW_DEFAULTS = dict.fromkeys(
+    ("SEM_EXM_EXCH_ID", "SEM_CUSTOM_SYMBOL", "SM_SYMBOL_NAME", "SEM_SEGMENT",
+     "SEM_INSTRUMENT_NAME", "SEM_LOT_UNITS"),
+    "N/A",
+)
 
-                        response_text += "\n"
 
-                return [TextContent(type="text", text=response_text)]
-            else:
-                return [TextContent(type="text", text=f"Failed to fetch market data: {data}")]
+async def _handle_search_instruments(api_client: DhanAPIClient, arguments: Dict[str, Any]) -> List[TextContent]:
+    """Search for instruments by symbol name or display name"""
+    query = arguments["query"].lower()
+    exchange_segment = arguments.get("exchangeSegment")
+    instrument_type = arguments.get("instrument")
+    limit = arguments.get("limit", 20)
+
+    # Served from the in-memory instrument index (exact, prefix, then
+    # substring matches), with the filters applied before the limit
+    await load_instrument_index()
+    matches = search_instrument_index(query.strip(), limit, exchange_segment, instrument_type)
+
+    if matches:
+        parts = [f"Search Results for '{query}':\n"]
+        parts.append(f"Found {len(matches)} matching instruments\n\n")
+
+        for instrument in matches:
+            parts.append(_format_search_row({**_SEARCH_ROW_DEFAULTS, **instrument}))
+
+        return [TextContent(type="text", text="".join(parts))]
+    else:
+        return [TextContent(type="text", text=f"No instruments found matching '{query}'")]
+
+
+_format_fund_limits = (
+    "Trading Account Fund Information:\n"
+    "Client ID: {dhanClientId}\n"
+    "Available Balance: ₹{availabelBalance:.2f}\n"
+    "Withdrawable Balance: ₹{withdrawableBalance:.2f}\n"
+    "SOD Limit: ₹{sodLimit:.2f}\n"
+    "Utilized Amount: ₹{utilizedAmount:.2f}\n"
+    "Collateral Amount: ₹{collateralAmount:.2f}\n"
+    "Receiveable Amount: ₹{receiveableAmount:.2f}\n"
+    "Blocked Payout: ₹{blockedPayoutAmount:.2f}\n"
+).format_map
+_format_utilization = "Utilization: {:.1f}%".format
+# Shown for fields missing from the /fundlimit response
+_FUND_DEFAULTS = {
+    "dhanClientId": "N/A",
+    "availabelBalance": 0,
+    "withdrawableBalance": 0,
+    "sodLimit": 0,
+    "utilizedAmount": 0,
+    "collateralAmount": 0,
+    "receiveableAmount": 0,
+    "blockedPayoutAmount": 0,
+}
 
-        elif name == "get_historical_data":
-            historical_data = {k: v for k, v in arguments.items() if v is not None}
-            data = await api_client.post("/charts/historical", historical_data)
 
-            if "open" in data and len(data["open"]) > 0:
-                response_text = f"Historical Data ({arguments['securityId']}):\n"
-                response_text += f"Period: {arguments['fromDate']} to {arguments['toDate']}\n"
-                response_text += f"Data Points: {len(data['open'])}\n\n"
+async def _handle_get_fund_limits(api_client: DhanAPIClient, arguments: Dict[str, Any]) -> List[TextContent]:
+    """Get trading account fund information including available balance, margins, etc."""
+    data = await api_client.get("/fundlimit")
+
+    # Format the response nicely, in one format_map call
+    values = {**_FUND_DEFAULTS, **data}
+    text = _format_fund_limits(values)
+
+    # Calculate utilization percentage
+    sod_limit = values['sodLimit']
+    if sod_limit > 0:
+        text += _format_utilization(values['utilizedAmount'] / sod_limit * 100)
+
+    return [TextContent(type="text", text=text)]
+
+
+# Tool name -> handler; call_tool dispatches with one dict lookup
+_HANDLERS = {
+    "get_profile": _handle_get_profile,
+    "get_ltp_by_symbol": _handle_get_ltp_by_symbol,
+    "validate_token": _handle_validate_token,
+    "place_order": _handle_place_order,
+    "modify_order": _handle_modify_order,
+    "cancel_order": _handle_cancel_order,
+    "slice_order": _handle_slice_order,
+    "get_orders": _handle_get_orders,
+    "get_order_by_id": _handle_get_order_by_id,
+    "get_order_by_correlation_id": _handle_get_order_by_correlation_id,
+    "get_trades": _handle_get_trades,
+    "get_trades_by_order_id": _handle_get_trades_by_order_id,
+    "calculate_margin": _handle_calculate_margin,
+    "get_ledger": _handle_get_ledger,
+    "get_historical_trades": _handle_get_historical_trades,
+    "get_market_ltp": partial(_handle_market_feed, name="get_market_ltp"),
+    "get_market_ohlc": partial(_handle_market_feed, name="get_market_ohlc"),
+    "get_market_depth": partial(_handle_market_feed, name="get_market_depth"),
+    "get_historical_data": _handle_get_historical_data,
+    "get_intraday_data": _handle_get_intraday_data,
+    "get_instrument_master": _handle_get_instrument_master,
+    "search_instruments": _handle_search_instruments,
+    "get_fund_limits": _handle_get_fund_limits,
+}
 
-                # Show last few data points
-                for i in range(min(5, len(data["open"]))):
-                    idx = len(data["open"]) - 1 - i
-                    response_text += f"Date: {data['timestamp'][idx]} (epoch)\n"
-                    response_text += f"OHLC: O:₹{data['open'][idx]} H:₹{data['high'][idx]} L:₹{data['low'][idx]} C:₹{data['close'][idx]}\n"
-                    response_text += f"Volume: {data['volume'][idx]:,}\n\n"
 
-                return [TextContent(type="text", text=response_text)]
-            else:
-                return [TextContent(type="text", text="No historical data found for the specified period")]
-
-        elif name == "get_intraday_data":
-            intraday_data = {k: v for k, v in arguments.items() if v is not None}
-            data = await api_client.post("/charts/intraday", intraday_data)
-
-            if "open" in data and len(data["open"]) > 0:
-                response_text = f"Intraday Data ({arguments['securityId']}):\n"
-                response_text += f"Interval: {arguments['interval']} minute(s)\n"
-                response_text += f"Period: {arguments['fromDate']} to {arguments['toDate']}\n"
-                response_text += f"Data Points: {len(data['open'])}\n\n"
-
-                # Show last few data points
-                for i in range(min(5, len(data["open"]))):
-                    idx = len(data["open"]) - 1 - i
-                    response_text += f"Time: {data['timestamp'][idx]} (epoch)\n"
-                    response_text += f"OHLC: O:₹{data['open'][idx]} H:₹{data['high'][idx]} L:₹{data['low'][idx]} C:₹{data['close'][idx]}\n"
-                    response_text += f"Volume: {data['volume'][idx]:,}\n\n"
-
-                return [TextContent(type="text", text=response_text)]
-            else:
-                return [TextContent(type="text", text="No intraday data found for the specified period")]
-
-        elif name == "get_instrument_master":
-            exchange_segment = arguments.get("exchangeSegment")
-            detailed = arguments.get("detailed", False)
-
-            if exchange_segment:
-                # Get segment-specific instrument list
-                data = await api_client.get(f"/instrument/{exchange_segment}")
-                response_text = f"Instrument Master for {exchange_segment}:\n"
-                response_text += f"Total Instruments: {len(data) if isinstance(data, list) else 'Unknown'}\n\n"
-
-                if isinstance(data, list) and len(data) > 0:
-                    # Show first 10 instruments
-                    for instrument in data[:10]:
-                        response_text += f"Security ID: {instrument.get('SEM_EXM_EXCH_ID', 'N/A')}\n"
-                        response_text += f"Symbol: {instrument.get('SEM_CUSTOM_SYMBOL', 'N/A')}\n"
-                        response_text += f"Name: {instrument.get('SM_SYMBOL_NAME', 'N/A')}\n"
-                        response_text += f"Instrument: {instrument.get('SEM_INSTRUMENT_NAME', 'N/A')}\n"
-                        response_text += f"Lot Size: {instrument.get('SEM_LOT_UNITS', 'N/A')}\n\n"
-
-                    if len(data) > 10:
-                        response_text += f"... and {len(data) - 10} more instruments"
-
-                return [TextContent(type="text", text=response_text)]
-            else:
-                # Get complete master list (CSV format)
-                import httpx
-
-                if detailed:
-                    csv_url = "https://images.dhan.co/api-data/api-scrip-master-detailed.csv"
-                else:
-                    csv_url = "https://images.dhan.co/api-data/api-scrip-master.csv"
-
-                async with httpx.AsyncClient() as client:
-                    csv_response = await client.get(csv_url)
-                    csv_response.raise_for_status()
-
-                    # Parse first few lines to show sample
-                    lines = csv_response.text.strip().split('\n')
-                    response_text = f"Complete Instrument Master ({'Detailed' if detailed else 'Compact'}):\n"
-                    response_text += f"Total Records: {len(lines) - 1}\n"  # Excluding header
-                    response_text += f"Source: {csv_url}\n\n"
-                    response_text += "Sample Data (First 5 records):\n"
-
-                    # Show header and first 5 data rows
-                    for i, line in enumerate(lines[:6]):
-                        if i == 0:
-                            response_text += f"Headers: {line}\n\n"
-                        else:
-                            response_text += f"Record {i}: {line}\n"
-
-                    response_text += f"\n... and {len(lines) - 6} more records"
-                    response_text += f"\n\nTo process this data, use the CSV URL: {csv_url}"
-
-                return [TextContent(type="text", text=response_text)]
-
-        elif name == "search_instruments":
-            query = arguments["query"].lower()
-            exchange_segment = arguments.get("exchangeSegment")
-            instrument_type = arguments.get("instrument")
-            limit = arguments.get("limit", 20)
-
-            # First get the instrument list
-            if exchange_segment:
-                # Search within specific segment
-                data = await api_client.get(f"/instrument/{exchange_segment}")
-            else:
-                # For broader search, we'll need to fetch CSV and parse
-                # This is a simplified version - in production, you might cache this data
-                import httpx
-
-                async with httpx.AsyncClient() as client:
-                    csv_response = await client.get("https://images.dhan.co/api-data/api-scrip-master.csv")
-                    csv_response.raise_for_status()
-
-                    # Simple CSV parsing (in production, use pandas or csv module)
-                    lines = csv_response.text.strip().split('\n')
-                    headers = lines[0].split(',')
-
-                    # Convert to dict format for consistency
-                    data = []
-                    for line in lines[1:]:  # Skip header
-                        values = line.split(',')
-                        if len(values) >= len(headers):
-                            record = dict(zip(headers, values))
-                            data.append(record)
-
-            # Search through the data
-            matches = []
-            if isinstance(data, list):
-                for instrument in data:
-                    # Search in symbol name and display name
-                    symbol_name = str(instrument.get('SM_SYMBOL_NAME', '')).lower()
-                    display_name = str(instrument.get('SEM_CUSTOM_SYMBOL', '')).lower()
-                    trading_symbol = str(instrument.get('SEM_TRADING_SYMBOL', '')).lower()
-
-                    if (query in symbol_name or query in display_name or query in trading_symbol):
-                        # Apply filters
-                        if exchange_segment and instrument.get('SEM_EXM_EXCH_ID') != exchange_segment:
-                            continue
-                        if instrument_type and instrument.get('SEM_INSTRUMENT_NAME') != instrument_type:
-                            continue
-
-                        matches.append(instrument)
-                        if len(matches) >= limit:
-                            break
-
-            if matches:
-                response_text = f"Search Results for '{query}':\n"
-                response_text += f"Found {len(matches)} matching instruments\n\n"
-
-                for instrument in matches:
-                    response_text += f"Security ID: {instrument.get('SEM_EXM_EXCH_ID', 'N/A')}\n"
-                    response_text += f"Symbol: {instrument.get('SEM_CUSTOM_SYMBOL', 'N/A')}\n"
-                    response_text += f"Name: {instrument.get('SM_SYMBOL_NAME', 'N/A')}\n"
-                    response_text += f"Exchange: {instrument.get('SEM_SEGMENT', 'N/A')}\n"
-                    response_text += f"Instrument: {instrument.get('SEM_INSTRUMENT_NAME', 'N/A')}\n"
-                    response_text += f"Lot Size: {instrument.get('SEM_LOT_UNITS', 'N/A')}\n\n"
-
-                return [TextContent(type="text", text=response_text)]
-            else:
-                return [TextContent(type="text", text=f"No instruments found matching '{query}'")]
+# Validation is done against _VALIDATORS rather than by the MCP server, which
+# would re-check each schema with generic jsonschema on every call
+@server.call_tool(validate_input=False)
+async def call_tool(name: str, arguments: Dict[str, Any]) -> Sequence[TextContent]:
+    """Execute a tool"""
+    validate = _VALIDATORS.get(name)
+    if validate is not None:
+        try:
+            validate(arguments)
+        except fastjsonschema.JsonSchemaValueException as e:
+            raise Exception(f"Input validation error: {e.message}")
 
-        elif name == "get_fund_limits":
-            data = await api_client.get("/fundlimit")
+    api_client = get_client()
+    if not api_client:
+        return [TextContent(type="text", text="Error: Dhan API client not initialized")]
 
-            # Format the response nicely
-            response_text = "Trading Account Fund Information:\n"
-            response_text += f"Client ID: {data.get('dhanClientId', 'N/A')}\n"
-            response_text += f"Available Balance: ₹{data.get('availabelBalance', 0):.2f}\n"
-            response_text += f"Withdrawable Balance: ₹{data.get('withdrawableBalance', 0):.2f}\n"
-            response_text += f"SOD Limit: ₹{data.get('sodLimit', 0):.2f}\n"
-            response_text += f"Utilized Amount: ₹{data.get('utilizedAmount', 0):.2f}\n"
-            response_text += f"Collateral Amount: ₹{data.get('collateralAmount', 0):.2f}\n"
-            response_text += f"Receiveable Amount: ₹{data.get('receiveableAmount', 0):.2f}\n"
-            response_text += f"Blocked Payout: ₹{data.get('blockedPayoutAmount', 0):.2f}\n"
-
-            # Calculate utilization percentage
-            sod_limit = data.get('sodLimit', 0)
-            utilized = data.get('utilizedAmount', 0)
-            if sod_limit > 0:
-                utilization_pct = (utilized / sod_limit) * 100
-                response_text += f"Utilization: {utilization_pct:.1f}%"
-
-            return [TextContent(type="text", text=response_text)]
+    handler = _HANDLERS.get(name)
+    if handler is None:
+        return [TextContent(type="text", text=f"Unknown tool: {name}")]
 
-        else:
-            return [TextContent(type="text", text=f"Unknown tool: {name}")]
+    try:
+        return await handler(api_client, arguments)
 
     except Exception as e:
         logger.error(f"Tool execution failed: {str(e)}")
@@ -1477,32 +2219,35 @@ async def call_tool(name: str, arguments: Dict[str, Any]) -> Sequence[TextConten
 
 async def main():
     """Main entry point"""
-    global config, api_client
-
-    # TODO: Load configuration from environment variables or config file
-    # For now, this is a placeholder - user needs to set their access token
-    import os
-    access_token = os.getenv("DHAN_ACCESS_TOKEN")
-
-    if not access_token:
-        logger.error("DHAN_ACCESS_TOKEN environment variable not set")
-        print("Please set DHAN_ACCESS_TOKEN environment variable with your Dhan API access token")
-        return
+    api_client = get_client()
 
-    config = DhanConfig(access_token=access_token)
-    api_client = DhanAPIClient(config)
+    if not api_client:
+        logger.error("DHAN_ACCESS_TOKEN environment variable not set (or still the .env placeholder)")
+        # stdout carries the MCP protocol; the hint goes to stderr
+        print("Please set DHAN_ACCESS_TOKEN environment variable with your Dhan API access token",
+              file=sys.stderr)
+        print("Get your token from: https://web.dhan.co → My Profile → Access DhanHQ APIs", file=sys.stderr)
+        raise SystemExit(1)
 
     # Run the server
     from mcp.server.stdio import stdio_server
     # from mcp.server.http import http_server
 
-    async with api_client:
-        async with stdio_server() as (read_stream, write_stream):
-            await server.run(
-                read_stream,
-                write_stream,
-                server.create_initialization_options()
-            )
+    # Load the instrument master while the client handshakes, so the first
+    # symbol lookup doesn't pay for the download
+    prefetch = asyncio.create_task(prefetch_instruments())
+
+    try:
+        async with api_client:
+            async with stdio_server() as (read_stream, write_stream):
+                await server.run(
+                    read_stream,
+                    write_stream,
+                    server.create_initialization_options()
+                )
+    finally:
+        prefetch.cancel()
+        await close_shared_client()
 
 
 if __name__ == "__main__":
@@ -4,14 +4,56 @@ Setup script for Dhan MCP Server
 Automated installation and configuration
 """
 
+import importlib.util
 import os
 import sys
+import shlex
 import subprocess
 import shutil
+import tempfile
+import urllib.request
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Optional
 
 
+# Run scripts are kept as files in the package, so they can be reviewed and
+# linted like any other source, and only copied into place here
+SCRIPTS_DIR = Path(__file__).resolve().parent / "dhan_mcp_server" / "_scripts"
+RUN_SCRIPTS = ("run_server.sh", "run_server.bat")
+
+# Written into missing package __init__.py files
+INIT_CONTENT = '''"""
+Dhan MCP Server - A Model Context Protocol server for Dhan trading platform
+"""
+
+__version__ = "0.1.0"
+__author__ = "Dhan MCP Server Team"
+__description__ = "Complete MCP server for Dhan trading platform integration"
+'''
+
+# Fallback .env.example, used when the checkout doesn't include one
+ENV_TEMPLATE = """# Dhan MCP Server Configuration
+# REQUIRED: Get your access token from https://web.dhan.co
+DHAN_ACCESS_TOKEN=your-dhan-access-token-here
+
+# Optional Configuration
+DHAN_BASE_URL=https://api.dhan.co/v2
+DHAN_REQUEST_TIMEOUT=30
+# Where the instrument master cache is kept (default: ~/.cache/dhan_mcp)
+DHAN_CACHE_DIR=
+
+# Partner Configuration (if applicable)
+DHAN_PARTNER_ID=
+DHAN_PARTNER_SECRET=
+DHAN_REDIRECT_URL=
+
+# Server Configuration
+LOG_LEVEL=INFO
+DEBUG=false
+"""
+
+
 class Colors:
     """ANSI color codes for terminal output"""
     HEADER = '\033[95m'
@@ -25,47 +67,61 @@ class Colors:
     UNDERLINE = '\033[4m'
 
 
+def colored(message: str, color: str = Colors.OKGREEN) -> str:
+    """Wrap a message in ANSI color codes"""
+    return f"{color}{message}{Colors.ENDC}"
+
+
 def print_colored(message: str, color: str = Colors.OKGREEN) -> None:
     """Print colored message to terminal"""
-    print(f"{color}{message}{Colors.ENDC}")
+    print(colored(message, color))
+
+
+def format_header(message: str) -> str:
+    """Header with formatting, as a single string"""
+    rule = "=" * 60
+    return f"\n{rule}\n{colored(f' {message} ', Colors.HEADER + Colors.BOLD)}\n{rule}"
 
 
 def print_header(message: str) -> None:
     """Print header with formatting"""
-    print("\n" + "=" * 60)
-    print_colored(f" {message} ", Colors.HEADER + Colors.BOLD)
-    print("=" * 60)
+    print(format_header(message))
 
 
-def run_command(command: str, description: str = "", check: bool = True) -> bool:
-    """Run a shell command and return success status"""
+def run_command(argv: List[str], description: str = "", check: bool = True,
+                timeout: int = 60, stream: bool = False) -> bool:
+    """Run a command (argument list, no intermediate shell) and return success status.
+
+    ``timeout`` is in seconds; pass a larger one only for commands that download.
+    With ``stream`` the command writes straight to the terminal, so long installs
+    show their progress instead of buffering it until they finish.
+    """
     if description:
         print(f"📦 {description}")
 
-    print(f"   Running: {command}")
+    print(f"   Running: {shlex.join(argv)}")
 
     try:
         result = subprocess.run(
-            command,
-            shell=True,
-            capture_output=True,
+            argv,
+            capture_output=not stream,
             text=True,
-            timeout=300  # 5 minute timeout
+            timeout=timeout
         )
 
         if result.returncode == 0:
-            if result.stdout.strip():
+            if result.stdout and result.stdout.strip():
                 print(f"   Output: {result.stdout.strip()}")
             print_colored("   ✅ Success", Colors.OKGREEN)
             return True
         else:
-            print_colored(f"   ❌ Error: {result.stderr}", Colors.FAIL)
+            print_colored(f"   ❌ Error: {result.stderr or f'exit status {result.returncode}'}", Colors.FAIL)
             if check:
                 return False
             return True
 
     except subprocess.TimeoutExpired:
-        print_colored("   ❌ Command timed out", Colors.FAIL)
+        print_colored(f"   ❌ Command timed out after {timeout}s", Colors.FAIL)
         return False
     except Exception as e:
         print_colored(f"   ❌ Exception: {str(e)}", Colors.FAIL)
@@ -83,8 +139,9 @@ def check_python_version() -> bool:
         return False
 
 
+@lru_cache(maxsize=32)
 def check_command_exists(command: str) -> bool:
-    """Check if a command exists in PATH"""
+    """Check if a command exists in PATH (cached; clear after changing PATH)"""
     return shutil.which(command) is not None
 
 
@@ -102,16 +159,25 @@ def install_uv() -> bool:
         print("Then run this script again.")
         return False
     else:
-        install_cmd = "curl -LsSf https://astral.sh/uv/install.sh | sh"
-        success = run_command(install_cmd, "Installing uv via curl")
+        # Fetch the installer ourselves and run it once, rather than curl | sh
+        with tempfile.NamedTemporaryFile(suffix=".sh", delete=False) as f:
+            installer = f.name
+        try:
+            try:
+                urllib.request.urlretrieve("https://astral.sh/uv/install.sh", installer)
+            except OSError as e:
+                print_colored(f"❌ Could not download the uv installer: {e}", Colors.FAIL)
+                return False
+            success = run_command(["sh", installer], "Installing uv", timeout=180, stream=True)
+        finally:
+            os.unlink(installer)
 
         if success:
-            # Try to source the shell profile to make uv available
-            shell_files = ["~/.bashrc", "~/.zshrc", "~/.profile"]
-            for shell_file in shell_files:
-                expanded_path = os.path.expanduser(shell_file)
-                if os.path.exists(expanded_path):
-                    run_command(f"source {expanded_path}", check=False)
+            # Sourcing shell profiles in a child shell can't change our PATH;
+            # add the installer's target directories to it directly instead
+            install_dirs = [os.path.expanduser("~/.local/bin"), os.path.expanduser("~/.cargo/bin")]
+            os.environ["PATH"] = os.pathsep.join(install_dirs + [os.environ.get("PATH", "")])
+            check_command_exists.cache_clear()
 
             # Check if uv is now available
             if check_command_exists("uv"):
@@ -137,7 +203,7 @@ def create_project_structure() -> bool:
     ]
 
     for directory in directories:
-        Path(directory).mkdir(exist_ok=True)
+        os.makedirs(directory, exist_ok=True)
         print(f"   Created: {directory}/")
 
     # Create __init__.py files
@@ -146,20 +212,14 @@ def create_project_structure() -> bool:
         "tests/__init__.py"
     ]
 
-    init_content = '''"""
-Dhan MCP Server - A Model Context Protocol server for Dhan trading platform
-"""
-
-__version__ = "0.1.0"
-__author__ = "Dhan MCP Server Team"
-__description__ = "Complete MCP server for Dhan trading platform integration"
-'''
-
     for init_file in init_files:
-        if not Path(init_file).exists():
-            with open(init_file, "w") as f:
-                f.write(init_content)
-            print(f"   Created: {init_file}")
+        # "x" creates the file only if it is missing: one open, no separate stat
+        try:
+            with open(init_file, "x") as f:
+                f.write(INIT_CONTENT)
+        except FileExistsError:
+            continue
+        print(f"   Created: {init_file}")
 
     print_colored("✅ Project structure created", Colors.OKGREEN)
     return True
@@ -174,34 +234,32 @@ def create_env_file() -> bool:
     if not Path(".env.example").exists():
         print_colored("⚠️  .env.example not found, creating template...", Colors.WARNING)
 
-        env_template = """# Dhan MCP Server Configuration
-# REQUIRED: Get your access token from https://web.dhan.co
-DHAN_ACCESS_TOKEN=your-dhan-access-token-here
-
-# Optional Configuration
-DHAN_BASE_URL=https://api.dhan.co/v2
-DHAN_REQUEST_TIMEOUT=30
-
-# Partner Configuration (if applicable)
-DHAN_PARTNER_ID=
-DHAN_PARTNER_SECRET=
-DHAN_REDIRECT_URL=
-
-# Server Configuration
-LOG_LEVEL=INFO
-DEBUG=false
-"""
-
         with open(".env.example", "w") as f:
-            f.write(env_template)
+            f.write(ENV_TEMPLATE)
         print("   Created: .env.example")
 
-    # Copy .env.example to .env
-    shutil.copy(".env.example", ".env")
+    # Copy .env.example to .env. Not a hard link: users edit .env in place, which
+    # would change .env.example too. copyfile already copies in-kernel where it
+    # can (sendfile on Linux, fcopyfile on macOS)
+    shutil.copyfile(".env.example", ".env")
     print_colored("✅ Created .env file from template", Colors.OKGREEN)
     return True
 
 
+def environment_is_synced() -> bool:
+    """Check, without output, that uv.lock matches pyproject.toml and .venv matches uv.lock.
+
+    A mismatch (or an older uv without ``--check``) is the normal case for
+    an out-of-date checkout, so it is not reported as an error.
+    """
+    try:
+        result = subprocess.run(["uv", "sync", "--locked", "--check", "--extra", "dev"],
+                                capture_output=True, timeout=60)
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+    return result.returncode == 0
+
+
 def install_dependencies() -> bool:
     """Install project dependencies using uv"""
     print_colored("📦 Installing dependencies...", Colors.OKBLUE)
@@ -210,131 +268,41 @@ def install_dependencies() -> bool:
         print_colored("❌ pyproject.toml not found. Please ensure all project files are present.", Colors.FAIL)
         return False
 
-    # Install dependencies
-    if not run_command("uv sync", "Installing project dependencies"):
-        # Fallback to pip if uv fails
-        print_colored("⚠️  uv sync failed, trying pip install...", Colors.WARNING)
-        return run_command("pip install -e .", "Installing with pip")
+    # Repeat runs: nothing to do if the environment already matches the lockfile
+    if Path(".venv").exists() and environment_is_synced():
+        print_colored("✅ Dependencies already up to date", Colors.OKGREEN)
+        return True
+
+    # Install project and development dependencies in one resolve; the dev
+    # extras are optional, so retry without them before giving up on uv
+    # Cold syncs download numpy/pandas/pyarrow wheels, hence the longer timeouts
+    if run_command(["uv", "sync", "--extra", "dev"], "Installing project and development dependencies",
+                   timeout=300, stream=True):
+        print_colored("✅ Dependencies installed", Colors.OKGREEN)
+        return True
 
-    # Install development dependencies
-    if not run_command("uv sync --extra dev", "Installing development dependencies", check=False):
-        print_colored("⚠️  Development dependencies installation failed (optional)", Colors.WARNING)
+    print_colored("⚠️  Development dependencies installation failed (optional)", Colors.WARNING)
+    if not run_command(["uv", "sync"], "Installing project dependencies", timeout=300,
+                       stream=True):
+        # Fall back to an editable install; uv's pip interface still reuses its wheel cache
+        print_colored("⚠️  uv sync failed, trying pip install...", Colors.WARNING)
+        if check_command_exists("uv"):
+            return run_command(["uv", "pip", "install", "-e", "."], "Installing with uv pip", timeout=300,
+                               stream=True)
+        return run_command([sys.executable, "-m", "pip", "install", "-e", "."], "Installing with pip",
+                           timeout=600, stream=True)
 
     print_colored("✅ Dependencies installed", Colors.OKGREEN)
     return True
 
 
 def create_run_scripts() -> bool:
-    """Create platform-specific run scripts"""
+    """Copy the platform-specific run scripts shipped in dhan_mcp_server/_scripts"""
     print_colored("Creating run scripts...", Colors.OKBLUE)
 
-    # Unix/Linux/macOS script
-    unix_script = """#!/bin/bash
-# Dhan MCP Server Run Script
-
-set -e
-
-# Colors for output
-RED='\\033[0;31m'
-GREEN='\\033[0;32m'
-YELLOW='\\033[1;33m'
-NC='\\033[0m' # No Color
-
-echo -e "${GREEN}Dhan MCP Server${NC}"
-echo "================================"
-
-# Check if .env file exists
-if [ ! -f .env ]; then
-    if [ ! -f .env.example ]; then
-        echo -e "${RED}Error: Neither .env nor .env.example found${NC}"
-        exit 1
-    fi
-    echo -e "${YELLOW}Creating .env file from .env.example...${NC}"
-    cp .env.example .env
-    echo -e "${YELLOW}Please edit .env file with your Dhan API credentials${NC}"
-    exit 1
-fi
-
-# Load environment variables
-set -a
-source .env
-set +a
-
-# Check if DHAN_ACCESS_TOKEN is set
-if [ -z "$DHAN_ACCESS_TOKEN" ] || [ "$DHAN_ACCESS_TOKEN" = "your-dhan-access-token-here" ]; then
-    echo -e "${RED}Error: Please set DHAN_ACCESS_TOKEN in .env file${NC}"
-    echo "Get your token from: https://web.dhan.co → My Profile → Access DhanHQ APIs"
-    exit 1
-fi
-
-echo -e "${GREEN}Configuration loaded${NC}"
-echo "Access Token: ${DHAN_ACCESS_TOKEN:0:10}***"
-echo ""
-echo -e "${GREEN}Starting Dhan MCP Server...${NC}"
-echo "Press Ctrl+C to stop"
-echo ""
-
-# Start the server
-uv run python -m dhan_mcp_server.server
-"""
-
-    # Windows script
-    windows_script = """@echo off
-REM Dhan MCP Server Run Script
-
-echo Dhan MCP Server
-echo ================================
-
-REM Check if .env file exists
-if not exist .env (
-    if not exist .env.example (
-        echo Error: Neither .env nor .env.example found
-        exit /b 1
-    )
-    echo Creating .env file from .env.example...
-    copy .env.example .env >nul
-    echo Please edit .env file with your Dhan API credentials
-    exit /b 1
-)
-
-REM Simple environment variable loading for Windows
-for /f "usebackq delims=" %%a in (".env") do (
-    for /f "tokens=1,2 delims==" %%b in ("%%a") do (
-        if not "%%b"=="" if not "%%c"=="" set "%%b=%%c"
-    )
-)
-
-REM Check if DHAN_ACCESS_TOKEN is set
-if "%DHAN_ACCESS_TOKEN%"=="" (
-    echo Error: Please set DHAN_ACCESS_TOKEN in .env file
-    echo Get your token from: https://web.dhan.co
-    exit /b 1
-)
-
-if "%DHAN_ACCESS_TOKEN%"=="your-dhan-access-token-here" (
-    echo Error: Please set DHAN_ACCESS_TOKEN in .env file
-    echo Get your token from: https://web.dhan.co
-    exit /b 1
-)
-
-echo Configuration loaded
-echo Access Token: %DHAN_ACCESS_TOKEN:~0,10%***
-echo.
-echo Starting Dhan MCP Server...
-echo Press Ctrl+C to stop
-echo.
-
-REM Start the server
-uv run python -m dhan_mcp_server.server
-"""
-
-    # Write scripts with proper encoding
     try:
-        with open("run_server.sh", "w", encoding='utf-8', newline='\n') as f:
-            f.write(unix_script)
-
-        with open("run_server.bat", "w", encoding='utf-8', newline='\r\n') as f:
-            f.write(windows_script)
+        for name in RUN_SCRIPTS:
+            shutil.copy(SCRIPTS_DIR / name, name)
 
         # Make Unix script executable
         if not sys.platform.startswith('win'):
@@ -345,9 +313,6 @@ uv run python -m dhan_mcp_server.server
         print_colored("Run scripts created", Colors.OKGREEN)
         return True
 
-    except UnicodeEncodeError as e:
-        print_colored(f"Unicode encoding error: {e}", Colors.FAIL)
-        return False
     except Exception as e:
         print_colored(f"Error creating run scripts: {e}", Colors.FAIL)
         return False
@@ -367,66 +332,79 @@ def validate_installation() -> bool:
         "run_server.bat"
     ]
 
-    missing_files = []
-    for file in critical_files:
-        if not Path(file).exists():
-            missing_files.append(file)
+    # One directory listing per parent instead of a stat per file
+    listings = {}
+    for directory in {os.path.dirname(file) or "." for file in critical_files}:
+        try:
+            with os.scandir(directory) as entries:
+                listings[directory] = {entry.name for entry in entries}
+        except OSError:
+            listings[directory] = set()
+
+    missing_files = [
+        file for file in critical_files
+        if os.path.basename(file) not in listings[os.path.dirname(file) or "."]
+    ]
 
     if missing_files:
         print_colored(f"❌ Missing files: {', '.join(missing_files)}", Colors.FAIL)
         return False
 
-    # Try to import the package
-    try:
-        sys.path.insert(0, ".")
-        import dhan_mcp_server
-        print_colored("✅ Package import successful", Colors.OKGREEN)
-    except ImportError as e:
-        print_colored(f"❌ Package import failed: {e}", Colors.FAIL)
+    # Check the package can be found, without executing it or its dependencies
+    sys.path.insert(0, ".")
+    if importlib.util.find_spec("dhan_mcp_server") is None:
+        print_colored("❌ Package dhan_mcp_server not found on the import path", Colors.FAIL)
         return False
+    print_colored("✅ Package import successful", Colors.OKGREEN)
 
     print_colored("✅ Installation validated", Colors.OKGREEN)
     return True
 
 
-def print_next_steps() -> None:
-    """Print next steps for the user"""
-    print_header("SETUP COMPLETE!")
-
-    print_colored("Next steps:", Colors.OKBLUE)
-    print("\n1. Configure your Dhan API access token:")
-    print_colored("   • Login to https://web.dhan.co", Colors.OKCYAN)
-    print_colored("   • Go to My Profile → Access DhanHQ APIs", Colors.OKCYAN)
-    print_colored("   • Generate your access token", Colors.OKCYAN)
-    print_colored("   • Edit .env file and set DHAN_ACCESS_TOKEN", Colors.OKCYAN)
-
-    print("\n2. Start the server:")
-    if sys.platform.startswith('win'):
-        print_colored("   run_server.bat", Colors.OKGREEN)
-    else:
-        print_colored("   ./run_server.sh", Colors.OKGREEN)
-
-    print("\n3. Test the installation:")
-    print_colored("   uv run python examples/example_usage.py", Colors.OKGREEN)
-
-    print("\n4. Development commands:")
-    print_colored("   uv run pytest              # Run tests", Colors.OKCYAN)
-    print_colored("   uv run black .             # Format code", Colors.OKCYAN)
-    print_colored("   uv run mypy .              # Type checking", Colors.OKCYAN)
-
-    print("\nDocumentation:")
-    print_colored("   • README.md - Complete documentation", Colors.OKCYAN)
-    print_colored("   • examples/ - Usage examples", Colors.OKCYAN)
-    print_colored("   • API docs: https://dhanhq.co/docs/", Colors.OKCYAN)
+def is_already_set_up() -> bool:
+    """Check whether a previous run already provisioned this checkout"""
+    return (
+        Path(".venv").exists()
+        and Path(".env").exists()
+        and Path("run_server.sh").exists()
+        and check_command_exists("uv")
+    )
 
-    print("\nImportant Security Notes:")
-    print_colored("   • Keep your API token secure and private", Colors.WARNING)
-    print_colored("   • Never commit .env files to version control", Colors.WARNING)
-    print_colored("   • Test with small quantities before live trading", Colors.WARNING)
 
-    print("\n" + "=" * 60)
-    print_colored("Dhan MCP Server is ready for production use!", Colors.OKGREEN + Colors.BOLD)
-    print("=" * 60)
+def print_next_steps() -> None:
+    """Print next steps for the user"""
+    start_command = "run_server.bat" if sys.platform.startswith('win') else "./run_server.sh"
+    lines = [
+        format_header("SETUP COMPLETE!"),
+        colored("Next steps:", Colors.OKBLUE),
+        "\n1. Configure your Dhan API access token:",
+        colored("   • Login to https://web.dhan.co", Colors.OKCYAN),
+        colored("   • Go to My Profile → Access DhanHQ APIs", Colors.OKCYAN),
+        colored("   • Generate your access token", Colors.OKCYAN),
+        colored("   • Edit .env file and set DHAN_ACCESS_TOKEN", Colors.OKCYAN),
+        "\n2. Start the server:",
+        colored(f"   {start_command}", Colors.OKGREEN),
+        "\n3. Test the installation:",
+        colored("   uv run python examples/example_usage.py", Colors.OKGREEN),
+        "\n4. Development commands:",
+        colored("   uv run pytest              # Run tests", Colors.OKCYAN),
+        colored("   uv run black .             # Format code", Colors.OKCYAN),
+        colored("   uv run mypy .              # Type checking", Colors.OKCYAN),
+        "\nDocumentation:",
+        colored("   • README.md - Complete documentation", Colors.OKCYAN),
+        colored("   • examples/ - Usage examples", Colors.OKCYAN),
+        colored("   • API docs: https://dhanhq.co/docs/", Colors.OKCYAN),
+        "\nImportant Security Notes:",
+        colored("   • Keep your API token secure and private", Colors.WARNING),
+        colored("   • Never commit .env files to version control", Colors.WARNING),
+        colored("   • Test with small quantities before live trading", Colors.WARNING),
+        "\n" + "=" * 60,
+        colored("Dhan MCP Server is ready for production use!", Colors.OKGREEN + Colors.BOLD),
+        "=" * 60,
+    ]
+    # One write for the whole block rather than a print per line
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
 
 
 def main() -> int:
@@ -438,25 +416,31 @@ def main() -> int:
         if not check_python_version():
             return 1
 
-        # Install uv package manager
-        if not install_uv():
-            print_colored("❌ Failed to install uv. Please install manually.", Colors.FAIL)
-            return 1
+        # Re-runs in a provisioned checkout still re-sync against the lockfile,
+        # but skip the one-time install and file-creation steps
+        provisioned = is_already_set_up()
+        if provisioned:
+            print_colored("✅ Already set up; checking dependencies only", Colors.OKGREEN)
+        else:
+            # Install uv package manager
+            if not install_uv():
+                print_colored("❌ Failed to install uv. Please install manually.", Colors.FAIL)
+                return 1
 
-        # Create project structure
-        if not create_project_structure():
-            return 1
+            # Create project structure
+            if not create_project_structure():
+                return 1
 
-        # Create environment file
-        if not create_env_file():
-            return 1
+            # Create environment file
+            if not create_env_file():
+                return 1
 
         # Install dependencies
         if not install_dependencies():
             return 1
 
         # Create run scripts
-        if not create_run_scripts():
+        if not provisioned and not create_run_scripts():
             return 1
 
         # Validate installation
@@ -0,0 +1,61 @@
+"""Tests for BatchCoalescer batching and shutdown"""
+
+import asyncio
+
+import pytest
+
+from dhan_mcp_server.server import BatchCoalescer
+
+
+class FakeClient:
+    """Records bulk POST bodies; each call waits on ``release`` if one is set"""
+
+    def __init__(self, release: asyncio.Event = None):
+        self.bodies = []
+        self.release = release
+
+    async def post(self, endpoint, body, headers=None, idempotent=False):
+        self.bodies.append(body)
+        if self.release is not None:
+            await self.release.wait()
+        data = {segment: {str(sid): {"last_price": sid} for sid in ids} for segment, ids in body.items()}
+        return {"status": "success", "data": data}
+
+
+async def test_requests_in_window_share_one_post():
+    client = FakeClient()
+    coalescer = BatchCoalescer(client, "/marketfeed/ltp", "cid", window=0.05)
+
+    first, second = await asyncio.gather(
+        coalescer.submit({"NSE_EQ": [1]}),
+        coalescer.submit({"NSE_EQ": [2]}),
+    )
+
+    assert client.bodies == [{"NSE_EQ": [1, 2]}]
+    assert first["data"] == {"NSE_EQ": {"1": {"last_price": 1}}}
+    assert second["data"] == {"NSE_EQ": {"2": {"last_price": 2}}}
+    await coalescer.close()
+
+
+async def test_close_during_window_cancels_dequeued_request():
+    coalescer = BatchCoalescer(FakeClient(), "/marketfeed/ltp", "cid", window=0.05)
+    task = asyncio.create_task(coalescer.submit({"NSE_EQ": [1]}))
+    await asyncio.sleep(0.01)  # The worker has taken the request and is lingering
+
+    await coalescer.close()
+
+    with pytest.raises(asyncio.CancelledError):
+        await asyncio.wait_for(task, 1)
+
+
+async def test_close_during_post_cancels_in_flight_batch():
+    client = FakeClient(release=asyncio.Event())
+    coalescer = BatchCoalescer(client, "/marketfeed/ltp", "cid")
+    task = asyncio.create_task(coalescer.submit({"NSE_EQ": [1]}))
+    while not client.bodies:
+        await asyncio.sleep(0)
+
+    await coalescer.close()
+
+    with pytest.raises(asyncio.CancelledError):
+        await asyncio.wait_for(task, 1)